@@ -0,0 +1,39 @@
+"""Add indexes for the joined elector lookup
+
+Revision ID: add_elector_lookup_indexes
+Revises: add_emprendedores_table, fix_recolectores_table
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_elector_lookup_indexes'
+down_revision: Union[str, None] = ('add_emprendedores_table', 'fix_recolectores_table')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Índices para los JOIN de la consulta única de verificar_cedula
+    op.create_index(
+        'ix_centros_votacion_codificacion_nueva_cv',
+        'centros_votacion',
+        ['codificacion_nueva_cv'],
+        unique=False
+    )
+    op.create_index(
+        'ix_geograficos_codigos',
+        'geograficos',
+        ['codigo_estado', 'codigo_municipio', 'codigo_parroquia'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_geograficos_codigos', table_name='geograficos')
+    op.drop_index('ix_centros_votacion_codificacion_nueva_cv', table_name='centros_votacion')
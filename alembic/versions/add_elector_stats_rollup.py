@@ -0,0 +1,58 @@
+"""Add elector_stats materialized rollup
+
+Revision ID: add_elector_stats_rollup
+Revises: add_ticket_codigos_geo
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_elector_stats_rollup'
+down_revision: Union[str, None] = 'add_ticket_codigos_geo'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Conteo de electores por centro de votación, sexo y rango de edad.
+    # Los nulos se guardan como 0 / '' para que el índice único (requisito
+    # de REFRESH ... CONCURRENTLY) cubra todas las filas. Se llena al final
+    # de la migración; después se actualiza con python -m app.refresh_elector_stats
+    # (o al final de bulk_load).
+    op.execute("""
+        CREATE MATERIALIZED VIEW elector_stats AS
+        SELECT
+            coalesce(codigo_estado, 0) AS codigo_estado,
+            coalesce(codigo_municipio, 0) AS codigo_municipio,
+            coalesce(codigo_parroquia, 0) AS codigo_parroquia,
+            coalesce(codigo_centro_votacion, 0) AS codigo_centro_votacion,
+            coalesce(sexo, '') AS sexo,
+            CASE
+                WHEN fecha_nacimiento IS NULL THEN 'sin_dato'
+                WHEN date_part('year', age(current_date, fecha_nacimiento)) < 26 THEN '18-25'
+                WHEN date_part('year', age(current_date, fecha_nacimiento)) < 36 THEN '26-35'
+                WHEN date_part('year', age(current_date, fecha_nacimiento)) < 46 THEN '36-45'
+                WHEN date_part('year', age(current_date, fecha_nacimiento)) < 56 THEN '46-55'
+                WHEN date_part('year', age(current_date, fecha_nacimiento)) < 66 THEN '56-65'
+                ELSE '66+'
+            END AS rango_edad,
+            count(*) AS total
+        FROM electores
+        GROUP BY 1, 2, 3, 4, 5, 6
+        WITH NO DATA
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX ix_elector_stats_jerarquia ON elector_stats
+        (codigo_estado, codigo_municipio, codigo_parroquia, codigo_centro_votacion, sexo, rango_edad)
+    """)
+    # Primer llenado sin CONCURRENTLY (no aplica a una vista sin datos); sin
+    # él /api/stats falla hasta el primer refresh
+    op.execute("REFRESH MATERIALIZED VIEW elector_stats")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS elector_stats")
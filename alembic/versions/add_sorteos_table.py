@@ -0,0 +1,41 @@
+"""Add sorteos table for auditable draws
+
+Revision ID: add_sorteos_table
+Revises: add_ticket_sorteo_indexes
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_sorteos_table'
+down_revision: Union[str, None] = 'add_ticket_sorteo_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sorteos',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('semilla', sa.String(length=128), nullable=False),
+        sa.Column('estado', sa.String(length=35), nullable=True),
+        sa.Column('municipio', sa.String(length=35), nullable=True),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.Column('total_elegibles', sa.Integer(), nullable=False),
+        sa.Column('snapshot', sa.LargeBinary(), nullable=False),
+        sa.Column('snapshot_hash', sa.String(length=64), nullable=False),
+        sa.Column('ganadores', postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index('ix_sorteos_id', 'sorteos', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sorteos_id', table_name='sorteos')
+    op.drop_table('sorteos')
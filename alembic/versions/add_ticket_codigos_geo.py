@@ -0,0 +1,43 @@
+"""Add geographic code columns to tickets
+
+Revision ID: add_ticket_codigos_geo
+Revises: add_trigram_search_indexes
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_ticket_codigos_geo'
+down_revision: Union[str, None] = 'add_trigram_search_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Columnas nulas: los tickets existentes se completan con
+    # python -m app.backfill_ticket_codigos, por lotes
+    op.add_column('tickets', sa.Column('codigo_estado', sa.Integer(), nullable=True))
+    op.add_column('tickets', sa.Column('codigo_municipio', sa.Integer(), nullable=True))
+    op.add_column('tickets', sa.Column('codigo_parroquia', sa.Integer(), nullable=True))
+    op.add_column('tickets', sa.Column('codigo_centro_votacion', sa.Integer(), nullable=True))
+    op.create_index(
+        'ix_tickets_codigos_geo',
+        'tickets',
+        ['codigo_estado', 'codigo_municipio', 'codigo_parroquia'],
+        unique=False
+    )
+    op.create_index('ix_tickets_codigo_centro_votacion', 'tickets', ['codigo_centro_votacion'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_codigo_centro_votacion', table_name='tickets')
+    op.drop_index('ix_tickets_codigos_geo', table_name='tickets')
+    op.drop_column('tickets', 'codigo_centro_votacion')
+    op.drop_column('tickets', 'codigo_parroquia')
+    op.drop_column('tickets', 'codigo_municipio')
+    op.drop_column('tickets', 'codigo_estado')
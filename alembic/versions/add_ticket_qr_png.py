@@ -0,0 +1,28 @@
+"""Store ticket QR codes as PNG bytes
+
+Revision ID: add_ticket_qr_png
+Revises: add_elector_lookup_indexes
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_ticket_qr_png'
+down_revision: Union[str, None] = 'add_elector_lookup_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Los tickets nuevos guardan el PNG en bytes; qr_ticket (base64) queda
+    # solo para los existentes
+    op.add_column('tickets', sa.Column('qr_png', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tickets', 'qr_png')
@@ -0,0 +1,42 @@
+"""Partial indexes for the winner draw
+
+Revision ID: add_ticket_sorteo_indexes
+Revises: move_ticket_qr_to_own_table
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_ticket_sorteo_indexes'
+down_revision: Union[str, None] = 'move_ticket_qr_to_own_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tickets elegibles para el sorteo, filtrables por estado y municipio
+    op.create_index(
+        'ix_tickets_elegibles_sorteo',
+        'tickets',
+        ['estado', 'municipio', 'id'],
+        unique=False,
+        postgresql_where=sa.text('validado AND NOT ganador')
+    )
+    # Ganadores actuales, para quitar la marca sin recorrer la tabla
+    op.create_index(
+        'ix_tickets_ganadores',
+        'tickets',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text('ganador')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_ganadores', table_name='tickets')
+    op.drop_index('ix_tickets_elegibles_sorteo', table_name='tickets')
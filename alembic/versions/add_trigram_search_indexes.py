@@ -0,0 +1,46 @@
+"""Trigram GIN indexes for text search
+
+Revision ID: add_trigram_search_indexes
+Revises: add_sorteos_table
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_trigram_search_indexes'
+down_revision: Union[str, None] = 'add_sorteos_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Columnas buscadas con ILIKE '%texto%' en listados y descargas
+SEARCH_COLUMNS = {
+    'tickets': ['cedula', 'nombre', 'telefono', 'numero_ticket'],
+    'recolectores': ['nombre', 'cedula', 'telefono'],
+    'emprendedores': ['cedula', 'nombre_apellido', 'nombre_emprendimiento', 'telefono'],
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            op.create_index(
+                f'ix_{table}_{column}_trgm',
+                table,
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'}
+            )
+
+
+def downgrade() -> None:
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
@@ -0,0 +1,48 @@
+"""Move ticket QR images to their own table
+
+Revision ID: move_ticket_qr_to_own_table
+Revises: add_ticket_qr_png
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'move_ticket_qr_to_own_table'
+down_revision: Union[str, None] = 'add_ticket_qr_png'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ticket_qr',
+        sa.Column('ticket_id', sa.Integer(), sa.ForeignKey('tickets.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('qr_png', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    # qr_png para los tickets nuevos, el base64 de qr_ticket para los anteriores
+    op.execute("""
+        INSERT INTO ticket_qr (ticket_id, qr_png, created_at)
+        SELECT id, COALESCE(qr_png, decode(qr_ticket, 'base64')), created_at
+        FROM tickets
+        WHERE qr_png IS NOT NULL OR (qr_ticket IS NOT NULL AND qr_ticket <> '')
+    """)
+    op.drop_column('tickets', 'qr_png')
+    op.drop_column('tickets', 'qr_ticket')
+
+
+def downgrade() -> None:
+    op.add_column('tickets', sa.Column('qr_ticket', sa.Text(), nullable=True))
+    op.add_column('tickets', sa.Column('qr_png', sa.LargeBinary(), nullable=True))
+    op.execute("""
+        UPDATE tickets t
+        SET qr_png = q.qr_png
+        FROM ticket_qr q
+        WHERE q.ticket_id = t.id
+    """)
+    op.drop_table('ticket_qr')
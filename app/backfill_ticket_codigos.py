@@ -0,0 +1,100 @@
+"""
+Completa codigo_estado/municipio/parroquia/centro_votacion de los tickets existentes.
+
+Primero toma los códigos del elector con la misma cédula; los tickets sin
+elector (cédula con otro formato, elector eliminado) se resuelven por los
+nombres de estado, municipio y parroquia contra `geograficos`. Avanza en
+lotes por rango de id, con una transacción por lote, así que se puede
+interrumpir y relanzar: solo toca tickets con codigo_estado nulo.
+
+Uso:
+    python -m app.backfill_ticket_codigos
+    python -m app.backfill_ticket_codigos --lote 5000
+"""
+import os
+import time
+import argparse
+import logging
+
+from redis import Redis
+from sqlalchemy import text
+
+from app.database import engine
+from app.utils.counts import invalidate_counts_sync
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6380/0")
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Cédula del ticket como número (acepta "V12345678", "12.345.678", etc.)
+CEDULA_NUMERO = "NULLIF(regexp_replace(t.cedula, '[^0-9]', '', 'g'), '')"
+
+FROM_ELECTORES = f"""
+    UPDATE tickets t
+    SET codigo_estado = e.codigo_estado,
+        codigo_municipio = e.codigo_municipio,
+        codigo_parroquia = e.codigo_parroquia,
+        codigo_centro_votacion = e.codigo_centro_votacion
+    FROM electores e
+    WHERE t.id >= :desde AND t.id < :hasta
+      AND t.codigo_estado IS NULL
+      AND length({CEDULA_NUMERO}) <= 9
+      AND e.numero_cedula = {CEDULA_NUMERO}::int
+"""
+
+FROM_GEOGRAFICOS = """
+    UPDATE tickets t
+    SET codigo_estado = g.codigo_estado,
+        codigo_municipio = g.codigo_municipio,
+        codigo_parroquia = g.codigo_parroquia
+    FROM geograficos g
+    WHERE t.id >= :desde AND t.id < :hasta
+      AND t.codigo_estado IS NULL
+      AND g.estado = t.estado
+      AND g.municipio = t.municipio
+      AND g.parroquia = t.parroquia
+"""
+
+
+def refresh_counts():
+    """Descarta los totales cacheados de tickets (ver app/utils/counts.py)."""
+    try:
+        invalidate_counts_sync(Redis.from_url(REDIS_URL), "tickets")
+    except Exception as e:
+        logging.warning(f"No se pudieron invalidar los contadores de tickets: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lote", type=int, default=10000, help="Tickets por transacción (rango de ids)")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        min_id, max_id = conn.execute(
+            text("SELECT min(id), max(id) FROM tickets WHERE codigo_estado IS NULL")
+        ).one()
+    if min_id is None:
+        logging.info("Todos los tickets tienen códigos geográficos")
+        return
+
+    por_elector = 0
+    por_nombre = 0
+    start = time.perf_counter()
+    for desde in range(min_id, max_id + 1, args.lote):
+        params = {"desde": desde, "hasta": desde + args.lote}
+        with engine.begin() as conn:
+            por_elector += conn.execute(text(FROM_ELECTORES), params).rowcount
+            por_nombre += conn.execute(text(FROM_GEOGRAFICOS), params).rowcount
+        logging.info(f"Hasta id {params['hasta'] - 1}: {por_elector} por elector, {por_nombre} por nombre")
+
+    with engine.connect() as conn:
+        pendientes = conn.execute(text("SELECT count(*) FROM tickets WHERE codigo_estado IS NULL")).scalar()
+    logging.info(
+        f"Listo en {time.perf_counter() - start:.1f}s: {por_elector} por elector, "
+        f"{por_nombre} por nombre, {pendientes} sin resolver"
+    )
+    refresh_counts()
+
+
+if __name__ == "__main__":
+    main()
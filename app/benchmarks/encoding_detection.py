@@ -0,0 +1,67 @@
+"""
+Benchmark de detección de codificación sobre los archivos de partes.
+
+Compara la detección anterior (chardet sobre el archivo completo) contra
+la muestra acotada y contra la lectura desde cache, y verifica que las
+tres coincidan.
+
+Uso:
+    python -m app.benchmarks.encoding_detection --dir data/split_files
+"""
+import os
+import time
+import argparse
+
+from app.utils.encoding import detect_encoding, detect_encoding_full, sample_encoding
+
+
+def timed(fn, path):
+    start = time.perf_counter()
+    result = fn(path)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default="data/split_files")
+    parser.add_argument("--limit", type=int, default=20, help="Máximo de archivos a medir")
+    parser.add_argument("--sin-completo", action="store_true", help="Omitir la detección sobre el archivo completo")
+    args = parser.parse_args()
+
+    files = sorted(
+        os.path.join(args.dir, name) for name in os.listdir(args.dir)
+        if name.endswith(('.csv', '.txt'))
+    )[:args.limit]
+    if not files:
+        print("No hay archivos para medir")
+        return
+
+    totals = {"completo": 0.0, "muestra": 0.0, "cache": 0.0}
+    mismatches = 0
+    print(f"{'archivo':<24} {'MB':>8} {'completo':>12} {'muestra':>12} {'cache':>10}  codificación")
+    for path in files:
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        full, full_ms = (None, 0.0) if args.sin_completo else timed(detect_encoding_full, path)
+        sampled, sample_ms = timed(sample_encoding, path)
+        detect_encoding(path)  # Llena el cache
+        cached, cache_ms = timed(detect_encoding, path)
+
+        totals["completo"] += full_ms
+        totals["muestra"] += sample_ms
+        totals["cache"] += cache_ms
+        same = full is None or (full or '').lower() == (sampled or '').lower() or (full or '').lower() == 'ascii'
+        if not same:
+            mismatches += 1
+        print(
+            f"{os.path.basename(path):<24} {size_mb:>8.1f} {full_ms:>10.1f}ms {sample_ms:>10.1f}ms "
+            f"{cache_ms:>8.3f}ms  {sampled}{'' if same else f' (completo: {full})'}"
+        )
+
+    print(
+        f"\nTotal: completo={totals['completo']:.0f}ms muestra={totals['muestra']:.0f}ms "
+        f"cache={totals['cache']:.2f}ms, diferencias={mismatches}"
+    )
+
+
+if __name__ == "__main__":
+    main()
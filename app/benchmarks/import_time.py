@@ -0,0 +1,87 @@
+"""
+Tiempo de arranque en frío de la API y de los bots.
+
+Importa cada punto de entrada en un proceso nuevo con `python -X importtime`
+y reporta el tiempo total de la importación (mediana de --repeat corridas)
+y los módulos que más tiempo acumulan. Importar no debe tocar la base de
+datos; pandas, qrcode, PIL, werkzeug y sse_starlette no deberían aparecer
+en la lista de app.main (se cargan al primer uso).
+
+Uso:
+    python -m app.benchmarks.import_time
+    python -m app.benchmarks.import_time --module app.main --top 25
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+ENTRY_POINTS = ["app.main", "app.bot", "app.telegram_bot.bot"]
+# Dependencias pesadas que deberían cargarse solo al usarse
+LAZY_MODULES = ["pandas", "qrcode", "PIL", "werkzeug", "sse_starlette", "xlsxwriter", "whatsapp_chatbot_python"]
+
+
+def import_profile(module: str) -> Tuple[float, List[Tuple[int, int, int, str]]]:
+    """
+    Devuelve (microsegundos totales, [(self_us, cumulative_us, nivel, módulo)])
+    a partir de la salida de -X importtime.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), level, name.strip()))
+    total = sum(row[1] for row in rows if row[2] == 0)
+    return total, rows
+
+
+def lazy_offenders(rows) -> List[str]:
+    loaded = {row[3].split(".")[0] for row in rows}
+    return [name for name in LAZY_MODULES if name in loaded]
+
+
+def report(module: str, repeat: int, top: int):
+    totals = []
+    rows: List[Tuple[int, int, int, str]] = []
+    for _ in range(repeat):
+        total, rows = import_profile(module)
+        totals.append(total)
+
+    print(f"\n{module}: {statistics.median(totals) / 1000:.0f} ms (mediana de {repeat}, {len(rows)} módulos)")
+    # Paquetes de primer nivel (sin submódulos) ordenados por tiempo acumulado
+    by_package: Dict[str, int] = {}
+    for self_us, cumulative_us, level, name in rows:
+        if "." not in name:
+            by_package[name] = max(by_package.get(name, 0), cumulative_us)
+    for name, cumulative_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {cumulative_us / 1000:>8.1f} ms  {name}")
+
+    offenders = lazy_offenders(rows)
+    if offenders:
+        print(f"  cargados al importar: {', '.join(offenders)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", action="append", help="Módulo a importar (por defecto API y bots)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Paquetes más lentos a mostrar")
+    args = parser.parse_args()
+
+    for module in args.module or ENTRY_POINTS:
+        report(module, args.repeat, args.top)
+
+
+if __name__ == "__main__":
+    main()
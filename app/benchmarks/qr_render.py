@@ -0,0 +1,64 @@
+"""
+Benchmark de generación del QR de los tickets.
+
+Compara el QR anterior (JSON con los datos del participante, PIL con
+box_size=10 y base64) contra el contenido firmado y el PNG de 1 bit.
+
+Uso:
+    python -m app.benchmarks.qr_render --n 500
+"""
+import json
+import time
+import base64
+import argparse
+from io import BytesIO
+
+import qrcode
+
+from app.utils.qr_tickets import render_ticket_qr, qr_payload
+
+
+def render_legacy(ticket_number: str) -> str:
+    qr_data = {
+        "ticket_number": ticket_number,
+        "cedula": "V12345678",
+        "nombre": "MARIA ALEJANDRA GONZALEZ RODRIGUEZ",
+        "telefono": "584141234567",
+        "estado": "DTTO. CAPITAL",
+        "municipio": "CE. LIBERTADOR",
+        "parroquia": "PQ. EL RECREO",
+        "referido_id": 1
+    }
+    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
+    qr.add_data(json.dumps(qr_data))
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buf = BytesIO()
+    img.save(buf)
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def measure(fn, n: int):
+    start = time.perf_counter()
+    for i in range(n):
+        result = fn(f"Tk{i:010d}")
+    return (time.perf_counter() - start) * 1000 / n, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=500, help="QR a generar por variante")
+    args = parser.parse_args()
+
+    legacy_ms, legacy_size = measure(render_legacy, args.n)
+    fast_ms, fast_size = measure(lambda t: render_ticket_qr(t, "benchmark"), args.n)
+
+    print(f"Contenido firmado: {qr_payload('Tk0000000000', 'benchmark')}")
+    print(f"{'variante':<10} {'ms/QR':>8} {'bytes guardados':>16}")
+    print(f"{'anterior':<10} {legacy_ms:>8.2f} {legacy_size:>16} (base64)")
+    print(f"{'nuevo':<10} {fast_ms:>8.2f} {fast_size:>16} (PNG)")
+    print(f"Aceleración: {legacy_ms / fast_ms:.1f}x, tamaño: {fast_size / legacy_size:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,8 @@ from pathlib import Path
 import random
 import base64
 import json
-import asyncio
 import time
 import re
-import qrcode
 from io import BytesIO
 import requests
 
@@ -16,15 +14,12 @@ sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from whatsapp_chatbot_python import GreenAPIBot, Notification
 from fastapi import HTTPException
-from app.schemas import CedulaRequest
-from app.main import (
-    get_db,
-    send_message,
-    send_qr_code,
-    obtener_numero_contacto,
-    enviar_contacto,
-    verificar_cedula,
-)
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.database import read_session, wait_for_database
+from app.utils import contact_phone
+from app.utils.greenapi_client import GreenAPIClient
+from app.utils.elector_lookup import verify_cedula
+from app.utils.message_queue import OutboundQueue
 
 API_INSTANCE = os.getenv("API_INSTANCE", "7103238857")
 API_TOKEN = os.getenv("API_TOKEN", "e36f48d77cc4444daa7126e2b02cab9c787da2fc2b92460792")
@@ -42,6 +37,33 @@ MEDIA_URL_BASE = os.getenv(
     "MEDIA_URL_BASE", f"https://7103.media.greenapi.com/waInstance{API_INSTANCE}"
 )
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6380/0")
+
+# Los QR, contactos y avisos de inactividad salen por la cola de Redis;
+# app.message_worker los entrega respetando el límite de la instancia.
+outbox = OutboundQueue.from_url(REDIS_URL)
+
+
+def send_message(chat_id, message):
+    outbox.send_text(chat_id, message)
+
+
+def send_qr_code(chat_id, qr_buf):
+    outbox.send_file(chat_id, qr_buf.getvalue(), "qrcode.png", "image/png")
+
+
+def enviar_contacto(chat_id, phone_contact, first_name, last_name, company):
+    outbox.send_contact(chat_id, phone_contact, first_name, last_name, company)
+
+
+# Cliente propio para consultar el número de la instancia (sin importar app.main)
+greenapi = GreenAPIClient(API_URL_BASE, API_TOKEN)
+
+
+def obtener_numero_contacto(db):
+    return contact_phone.obtener_numero_contacto(db, greenapi)
+
+
 # Constante para el tiempo máximo de inactividad (5 minutos)
 MAX_INACTIVITY_TIME_SECONDS = 300
 
@@ -232,7 +254,7 @@ def obtener_cedula(notification: Notification) -> None:
     db = None
     try:
         # Verificar la carga actual del sistema antes de procesar
-        db = next(get_db())
+        db = read_session()
         
         sender = notification.sender
         message_data = notification.event.get("messageData", {})
@@ -333,9 +355,7 @@ def obtener_cedula(notification: Notification) -> None:
 
         # 1. Primero verificamos si la cédula existe en la base de datos de electores
         print(f"Enviando cédula {cedula} para verificación")
-        elector_response = asyncio.run(
-            verificar_cedula(CedulaRequest(numero_cedula=cedula), db)
-        )
+        elector_response = verify_cedula(db, cedula) or {}
         print(f"Respuesta de verificación de elector: {elector_response}")
 
         if elector_response.get("elector"):
@@ -359,8 +379,11 @@ def obtener_cedula(notification: Notification) -> None:
                     print(f"Ticket encontrado: {existing_ticket}")
                     chat_id = existing_ticket["telefono"]
 
-                    qr_code_base64 = existing_ticket["qr_ticket"]
-                    qr_buf = BytesIO(base64.b64decode(qr_code_base64))
+                    qr_response = requests.get(
+                        f"{INTERNAL_API_URL}/api/tickets/{existing_ticket['id']}/qr.png"
+                    )
+                    qr_response.raise_for_status()
+                    qr_buf = BytesIO(qr_response.content)
 
                     message = (
                         f"{nombre_completo}, hoy es tu día de suerte!\n\n"
@@ -466,7 +489,8 @@ def obtener_cedula(notification: Notification) -> None:
 
     except Exception as e:
         print(f"Error en obtener_cedula: {e}")
-        if "QueuePool limit of size" in str(e) or "connection timed out" in str(e):
+        # Pool agotado (ver db_pool_checked_out / db_pool_wait_seconds en /metrics)
+        if isinstance(e, PoolTimeoutError) or "connection timed out" in str(e):
             notification.answer(
                 "Nuestro sistema está experimentando alta demanda en este momento. "
                 "Por favor, intenta nuevamente en unos minutos."
@@ -832,6 +856,8 @@ def handle_registro_promotor(
                             qr_data_json = json.dumps(qr_data)
 
                             # Crear código QR
+                            import qrcode
+
                             qr = qrcode.QRCode(
                                 version=1,
                                 error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -950,7 +976,7 @@ def handle_registro_promotor(
                             f"No se pudo enviar la imagen QR. Usa este enlace para contactarnos: {whatsapp_link_short}"
                         )
 
-                db_aux = next(get_db())
+                db_aux = read_session()
                 phone_contact = obtener_numero_contacto(db_aux)
                 if phone_contact:
                     print(f"Enviando contacto: {phone_contact}")
@@ -1398,17 +1424,6 @@ if __name__ == "__main__":
                 })
                 print("Configuración de webhooks actualizada")
             
-            # Probar conexión a la base de datos
-            print("\nVerificando conexión a la base de datos...")
-            try:
-                db = next(get_db())
-                # Realizar una consulta simple para verificar la conexión
-                result = db.execute("SELECT 1").scalar()
-                print(f"Conexión a la base de datos establecida: {result == 1}")
-                db.close()  # Importante: cerrar la conexión después de usarla
-            except Exception as db_err:
-                print(f"Error al verificar la conexión a la base de datos: {db_err}")
-            
             # Probar envío de un mensaje al teléfono del sistema
             system_phone = "584262831867"
             print(f"\nEnviando mensaje de prueba al teléfono del sistema: {system_phone}")
@@ -1423,6 +1438,11 @@ if __name__ == "__main__":
             print(f"ERROR al inicializar el bot: {e}")
             print("Continuando de todos modos...")
     
+    # Sin base de datos el bot no puede verificar cédulas: se reintenta y, si
+    # no responde, el proceso termina y docker lo reinicia
+    print("\nVerificando conexión a la base de datos...")
+    wait_for_database()
+
     # Inicializar el bot
     init_bot()
     
@@ -0,0 +1,294 @@
+"""
+Carga masiva del registro electoral usando COPY.
+
+Cada archivo de partes (salida de split_csv.py) se copia con
+COPY FROM STDIN a una tabla temporal y se integra a `electores` con dos
+sentencias por conjunto: un UPDATE de los electores que cambiaron y un
+INSERT de los que no existen (la cédula es la llave, igual que en
+load_data.py). Todo ocurre en una transacción por archivo y el archivo
+queda registrado en `cargas_electores`, así que al relanzar la carga
+después de una interrupción los archivos ya integrados se omiten.
+
+Al terminar se recalcula la vista materializada elector_stats
+(CONCURRENTLY, sin bloquear las lecturas del panel).
+
+Con --workers N los archivos se reparten entre N procesos, cada uno con
+su propia conexión y su propio COPY; `cargas_electores` funciona como
+manifiesto común de las partes terminadas.
+
+Uso:
+    python -m app.bulk_load --dir data/split_files
+    python -m app.bulk_load --dir data/split_files --modo insert
+    python -m app.bulk_load --dir data/split_files --workers 8
+"""
+import os
+import re
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from redis import Redis
+from sqlalchemy.dialects import postgresql
+
+from app.database import engine
+from app.models import Elector
+from app.utils.encoding import detect_encoding, redetect_encoding
+from app.utils.counts import invalidate_counts_sync
+from app.refresh_elector_stats import refresh_stats
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6380/0")
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+CONTROL_TABLE = "cargas_electores"
+STAGING_TABLE = "electores_staging"
+# Llave del advisory lock que serializa la integración entre workers
+MERGE_LOCK_KEY = 730021
+
+# Columnas en el orden del archivo del registro (todas menos el id)
+ELECTOR_COLUMNS = [column for column in Elector.__table__.columns if column.key != 'id']
+COLUMN_NAMES = [column.key for column in ELECTOR_COLUMNS]
+# Columnas de texto: un campo vacío se guarda como '' (como hacía la carga con el ORM), no como NULL
+TEXT_COLUMNS = [column.key for column in ELECTOR_COLUMNS if column.type.python_type is str]
+
+
+def staging_table_sql() -> str:
+    dialect = postgresql.dialect()
+    columns = ",\n    ".join(
+        f"{column.key} {column.type.compile(dialect=dialect)}" for column in ELECTOR_COLUMNS
+    )
+    return f"CREATE TEMP TABLE {STAGING_TABLE} (\n    {columns}\n) ON COMMIT DROP"
+
+
+def copy_sql() -> str:
+    return (
+        f"COPY {STAGING_TABLE} ({', '.join(COLUMN_NAMES)}) FROM STDIN "
+        f"WITH (FORMAT csv, HEADER true, FORCE_NOT_NULL ({', '.join(TEXT_COLUMNS)}))"
+    )
+
+
+def update_sql() -> str:
+    data_columns = [name for name in COLUMN_NAMES if name != 'numero_cedula']
+    assignments = ", ".join(f"{name} = s.{name}" for name in data_columns)
+    current = ", ".join(f"e.{name}" for name in data_columns)
+    incoming = ", ".join(f"s.{name}" for name in data_columns)
+    return f"""
+        UPDATE electores e SET {assignments}
+        FROM (
+            SELECT DISTINCT ON (numero_cedula) * FROM {STAGING_TABLE} ORDER BY numero_cedula
+        ) s
+        WHERE e.numero_cedula = s.numero_cedula
+          AND ({current}) IS DISTINCT FROM ({incoming})
+    """
+
+
+def insert_sql() -> str:
+    columns = ", ".join(COLUMN_NAMES)
+    selected = ", ".join(f"s.{name}" for name in COLUMN_NAMES)
+    return f"""
+        INSERT INTO electores ({columns})
+        SELECT DISTINCT ON (s.numero_cedula) {selected}
+        FROM {STAGING_TABLE} s
+        WHERE NOT EXISTS (SELECT 1 FROM electores e WHERE e.numero_cedula = s.numero_cedula)
+        ORDER BY s.numero_cedula
+    """
+
+
+def ensure_control_table(conn):
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {CONTROL_TABLE} (
+                archivo TEXT PRIMARY KEY,
+                huella TEXT NOT NULL,
+                filas INTEGER,
+                insertados INTEGER,
+                actualizados INTEGER,
+                cargado_en TIMESTAMPTZ DEFAULT now()
+            )
+        """)
+    conn.commit()
+
+
+def file_fingerprint(filepath: str) -> str:
+    """Tamaño y fecha de modificación: si el archivo cambia, se vuelve a cargar."""
+    stat = os.stat(filepath)
+    return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def loaded_files(conn) -> dict:
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT archivo, huella FROM {CONTROL_TABLE}")
+        return dict(cur.fetchall())
+
+
+def list_part_files(input_dir: str) -> list:
+    """Archivos .csv del directorio, en orden numérico (part_2 antes que part_10)."""
+    def sort_key(filename):
+        match = re.search(r'(\d+)', filename)
+        return (int(match.group(1)) if match else 0, filename)
+
+    return [
+        os.path.join(input_dir, filename)
+        for filename in sorted(os.listdir(input_dir), key=sort_key)
+        if filename.endswith('.csv')
+    ]
+
+
+def copy_file(cur, filepath: str, encoding: str) -> int:
+    with open(filepath, 'r', encoding=encoding, newline='') as file:
+        cur.copy_expert(copy_sql(), file)
+    return cur.rowcount
+
+
+def load_file(conn, filepath: str, modo: str = "upsert", merge_lock: bool = False) -> dict:
+    """
+    Copia un archivo a la tabla temporal y lo integra a electores en una
+    sola transacción. Devuelve filas copiadas, insertadas y actualizadas.
+
+    Con `merge_lock` el COPY corre en paralelo pero el UPDATE/INSERT sobre
+    electores se serializa entre procesos, de modo que una misma cédula en
+    dos partes distintas no termine insertada dos veces.
+    """
+    encoding = detect_encoding(filepath)
+    archivo = os.path.basename(filepath)
+    start = time.perf_counter()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(staging_table_sql())
+            try:
+                copied = copy_file(cur, filepath, encoding)
+            except UnicodeDecodeError as e:
+                # El muestreo no vio los bytes que fallan: se analiza el archivo completo
+                conn.rollback()
+                failed, encoding = encoding, redetect_encoding(filepath, encoding)
+                logging.warning(f"{archivo}: {failed} no decodifica el archivo ({e}); reintentando con {encoding}")
+                cur.execute(staging_table_sql())
+                copied = copy_file(cur, filepath, encoding)
+            cur.execute(f"ANALYZE {STAGING_TABLE}")
+            if merge_lock:
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (MERGE_LOCK_KEY,))
+
+            updated = 0
+            if modo == "upsert":
+                cur.execute(update_sql())
+                updated = cur.rowcount
+            cur.execute(insert_sql())
+            inserted = cur.rowcount
+
+            cur.execute(f"""
+                INSERT INTO {CONTROL_TABLE} (archivo, huella, filas, insertados, actualizados)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (archivo) DO UPDATE SET
+                    huella = EXCLUDED.huella,
+                    filas = EXCLUDED.filas,
+                    insertados = EXCLUDED.insertados,
+                    actualizados = EXCLUDED.actualizados,
+                    cargado_en = now()
+            """, (archivo, file_fingerprint(filepath), copied, inserted, updated))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    elapsed = time.perf_counter() - start
+    logging.info(
+        f"{archivo} ({encoding}): {copied} filas en {elapsed:.1f}s "
+        f"({copied / elapsed if elapsed else 0:,.0f} filas/s), "
+        f"{inserted} insertadas, {updated} actualizadas"
+    )
+    return {"filas": copied, "insertados": inserted, "actualizados": updated, "segundos": elapsed}
+
+
+# Conexión propia de cada proceso del pool
+_worker_conn = None
+
+
+def _init_worker():
+    global _worker_conn
+    # Las conexiones heredadas del proceso padre no se deben reutilizar
+    engine.dispose(close=False)
+    _worker_conn = engine.raw_connection()
+
+
+def _load_in_worker(filepath: str, modo: str, merge_lock: bool) -> dict:
+    return load_file(_worker_conn, filepath, modo, merge_lock=merge_lock)
+
+
+def load_parallel(filepaths: list, modo: str, workers: int, merge_lock: bool) -> int:
+    total_rows = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(_load_in_worker, filepath, modo, merge_lock): filepath
+            for filepath in filepaths
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            archivo = os.path.basename(futures[future])
+            try:
+                total_rows += future.result()["filas"]
+                logging.info(f"Partes terminadas: {done}/{len(filepaths)}")
+            except Exception as e:
+                # El resto de las partes sigue; la fallida queda pendiente en el manifiesto
+                logging.error(f"Error cargando {archivo}: {e}")
+    return total_rows
+
+
+def refresh_counts():
+    """Descarta los totales cacheados de electores (ver app/utils/counts.py)."""
+    try:
+        invalidate_counts_sync(Redis.from_url(REDIS_URL), "electores")
+    except Exception as e:
+        logging.warning(f"No se pudieron invalidar los contadores de electores: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default="data/split_files", help="Directorio con los archivos de partes")
+    parser.add_argument("--modo", choices=["upsert", "insert"], default="upsert",
+                        help="upsert actualiza electores existentes; insert solo agrega cédulas nuevas")
+    parser.add_argument("--forzar", action="store_true", help="Volver a cargar archivos ya registrados")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos que cargan partes en paralelo")
+    parser.add_argument("--partes-disjuntas", action="store_true",
+                        help="Las partes no comparten cédulas: integrar en paralelo sin serializar")
+    args = parser.parse_args()
+
+    conn = engine.raw_connection()
+    try:
+        ensure_control_table(conn)
+        done = {} if args.forzar else loaded_files(conn)
+
+        pending = []
+        for filepath in list_part_files(args.dir):
+            archivo = os.path.basename(filepath)
+            if done.get(archivo) == file_fingerprint(filepath):
+                logging.info(f"{archivo}: ya cargado, se omite")
+                continue
+            pending.append(filepath)
+        logging.info(f"Partes pendientes: {len(pending)}")
+
+        total_rows = 0
+        start = time.perf_counter()
+        if args.workers > 1:
+            total_rows = load_parallel(pending, args.modo, args.workers, merge_lock=not args.partes_disjuntas)
+        else:
+            for filepath in pending:
+                try:
+                    total_rows += load_file(conn, filepath, args.modo)["filas"]
+                except Exception as e:
+                    logging.error(f"Error cargando {os.path.basename(filepath)}: {e}")
+                    raise
+
+        elapsed = time.perf_counter() - start
+        logging.info(
+            f"Carga terminada: {total_rows} filas en {elapsed:.1f}s "
+            f"({total_rows / elapsed if elapsed else 0:,.0f} filas/s)"
+        )
+        if pending:
+            refresh_counts()
+            refresh_stats()
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
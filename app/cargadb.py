@@ -4,18 +4,13 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.models import Elector, Geografico, CentroVotacion
-import chardet
+from app.utils.encoding import detect_encoding
 import logging
 from tqdm import tqdm
 
 # Configuración de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def detect_encoding(file_path):
-    with open(file_path, 'rb') as f:
-        result = chardet.detect(f.read())
-        return result['encoding']
-
 def load_electors(filepath: str, db: Session):
     encoding = detect_encoding(filepath)
     logging.info(f"Loading electors from {filepath} with encoding {encoding}")
@@ -0,0 +1,219 @@
+"""
+Worker de la cola de mensajes salientes de WhatsApp.
+
+Consume `whatsapp:outbox` en orden, respetando un máximo de mensajes por
+segundo por instancia de GreenAPI (compartido entre workers a través de
+Redis). Los fallos temporales se reprograman con backoff; los que agotan
+los reintentos, o que GreenAPI rechaza, pasan a `whatsapp:outbox:dead`.
+
+Cada worker mueve el mensaje en curso a `whatsapp:outbox:processing:<nombre>`
+y renueva `whatsapp:outbox:worker:<nombre>` mientras vive. Al arrancar
+recupera su propia lista, y periódicamente devuelve a la cola las listas de
+workers cuyo latido expiró (procesos que murieron y no volvieron a arrancar
+con el mismo nombre).
+
+Uso:
+    python -m app.message_worker
+"""
+import os
+import json
+import time
+import base64
+import socket
+
+from redis import Redis
+
+from app.utils.greenapi_client import GreenAPIClient, GreenAPIError, RETRY_STATUS
+from app.utils.message_queue import (
+    OUTBOX_KEY,
+    RETRY_KEY,
+    DEAD_KEY,
+    METRICS_KEY,
+    PROCESSING_PREFIX,
+    WORKER_PREFIX,
+    TEXT,
+    FILE,
+    CONTACT,
+    parse_message
+)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6380/0")
+API_INSTANCE = os.getenv("API_INSTANCE", "7103238857")
+API_URL_BASE = os.getenv("API_URL_BASE", f"https://7103.api.greenapi.com/waInstance{API_INSTANCE}")
+API_TOKEN = os.getenv("API_TOKEN", "e36f48d77cc4444daa7126e2b02cab9c787da2fc2b92460792")
+
+MESSAGES_PER_SECOND = int(os.getenv("WHATSAPP_MESSAGES_PER_SECOND", "2"))
+MAX_ATTEMPTS = int(os.getenv("WHATSAPP_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = float(os.getenv("WHATSAPP_RETRY_BASE_SECONDS", "5"))
+WORKER_NAME = os.getenv("WORKER_NAME", socket.gethostname())
+# Vigencia del latido (holgada frente a un envío lento con reintento) y cada
+# cuánto se buscan listas huérfanas
+WORKER_HEARTBEAT_TTL = int(os.getenv("WHATSAPP_WORKER_HEARTBEAT_TTL", "120"))
+RECOVER_INTERVAL = float(os.getenv("WHATSAPP_RECOVER_INTERVAL", "60"))
+
+
+class RateLimiter:
+    """Ventana fija de un segundo por instancia, contada en Redis."""
+
+    def __init__(self, redis_client: Redis, instance: str, per_second: int):
+        self.redis = redis_client
+        self.instance = instance
+        self.per_second = per_second
+
+    def acquire(self):
+        while True:
+            now = time.time()
+            window = int(now)
+            key = f"whatsapp:ratelimit:{self.instance}:{window}"
+            pipe = self.redis.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, 2)
+            count, _ = pipe.execute()
+            if count <= self.per_second:
+                return
+            time.sleep(max(0.01, window + 1 - now))
+
+
+class PermanentError(Exception):
+    """GreenAPI rechazó el mensaje; reintentarlo no cambiaría el resultado."""
+
+
+def deliver(greenapi: GreenAPIClient, message: dict):
+    chat_id = message["chat_id"]
+    payload = message["payload"]
+    kind = message["kind"]
+
+    if kind == TEXT:
+        result = greenapi.send_message_sync(chat_id, payload["message"])
+    elif kind == FILE:
+        content = base64.b64decode(payload["content"])
+        result = greenapi.send_file_by_upload_sync(chat_id, content, payload["filename"], payload["mime_type"])
+    elif kind == CONTACT:
+        result = greenapi.send_contact_sync(
+            chat_id, payload["phone_contact"], payload["first_name"], payload["last_name"], payload["company"]
+        )
+    else:
+        raise PermanentError(f"Tipo de mensaje desconocido: {kind}")
+
+    if not isinstance(result, dict) or "idMessage" not in result:
+        raise PermanentError(f"La API respondió pero no indicó éxito: {result}")
+    return result
+
+
+class MessageWorker:
+    def __init__(self, redis_client: Redis, greenapi: GreenAPIClient, rate_limiter: RateLimiter):
+        self.redis = redis_client
+        self.greenapi = greenapi
+        self.rate_limiter = rate_limiter
+        self.processing_key = f"{PROCESSING_PREFIX}{WORKER_NAME}"
+        self.heartbeat_key = f"{WORKER_PREFIX}{WORKER_NAME}"
+        self.last_beat = 0.0
+        self.last_recover = 0.0
+
+    def requeue(self, processing_key: str) -> int:
+        recovered = 0
+        while self.redis.lmove(processing_key, OUTBOX_KEY, "RIGHT", "LEFT"):
+            recovered += 1
+        return recovered
+
+    def recover_in_flight(self):
+        """Devuelve a la cola los mensajes que este worker tenía en curso al morir."""
+        recovered = self.requeue(self.processing_key)
+        if recovered:
+            print(f"Mensajes recuperados de una ejecución anterior: {recovered}")
+
+    def beat(self):
+        now = time.time()
+        if now - self.last_beat >= WORKER_HEARTBEAT_TTL / 3:
+            self.redis.set(self.heartbeat_key, int(now), ex=WORKER_HEARTBEAT_TTL)
+            self.last_beat = now
+
+    def recover_stale(self):
+        """Devuelve a la cola los mensajes en curso de workers sin latido."""
+        now = time.time()
+        if now - self.last_recover < RECOVER_INTERVAL:
+            return
+        self.last_recover = now
+        for processing_key in self.redis.scan_iter(match=f"{PROCESSING_PREFIX}*"):
+            worker = processing_key[len(PROCESSING_PREFIX):]
+            if worker == WORKER_NAME or self.redis.exists(f"{WORKER_PREFIX}{worker}"):
+                continue
+            recovered = self.requeue(processing_key)
+            if recovered:
+                print(f"Mensajes recuperados del worker {worker}: {recovered}")
+
+    def promote_due_retries(self):
+        now = time.time()
+        due = self.redis.zrangebyscore(RETRY_KEY, 0, now)
+        for raw in due:
+            # Solo quien logra sacarlo del sorted set lo vuelve a encolar
+            if self.redis.zrem(RETRY_KEY, raw):
+                self.redis.rpush(OUTBOX_KEY, raw)
+
+    def fail(self, message: dict, error: Exception, retryable: bool):
+        message["attempts"] = message.get("attempts", 0) + 1
+        message["last_error"] = str(error)
+        if retryable and message["attempts"] < MAX_ATTEMPTS:
+            delay = RETRY_BASE_SECONDS * (2 ** (message["attempts"] - 1))
+            self.redis.zadd(RETRY_KEY, {json.dumps(message): time.time() + delay})
+            self.redis.hincrby(METRICS_KEY, "reintentos", 1)
+            print(f"Mensaje {message['id']} a {message['chat_id']}: reintento en {delay:.0f}s ({error})")
+        else:
+            message["failed_at"] = time.time()
+            self.redis.rpush(DEAD_KEY, json.dumps(message))
+            self.redis.hincrby(METRICS_KEY, "descartados", 1)
+            print(f"Mensaje {message['id']} a {message['chat_id']} descartado: {error}")
+
+    def handle(self, raw: str):
+        message = parse_message(raw)
+        if message is None:
+            self.redis.rpush(DEAD_KEY, raw)
+            self.redis.hincrby(METRICS_KEY, "descartados", 1)
+            return
+
+        self.rate_limiter.acquire()
+        try:
+            deliver(self.greenapi, message)
+        except PermanentError as e:
+            self.fail(message, e, retryable=False)
+        except GreenAPIError as e:
+            retryable = e.status_code is None or e.status_code in RETRY_STATUS or e.status_code >= 500
+            self.fail(message, e, retryable=retryable)
+        except Exception as e:
+            self.fail(message, e, retryable=True)
+        else:
+            latency_ms = (time.time() - message.get("enqueued_at", time.time())) * 1000
+            pipe = self.redis.pipeline()
+            pipe.hincrby(METRICS_KEY, "enviados", 1)
+            pipe.hincrbyfloat(METRICS_KEY, "latencia_total_ms", latency_ms)
+            pipe.execute()
+
+    def run(self):
+        print(f"Worker de mensajes {WORKER_NAME} iniciado ({MESSAGES_PER_SECOND} msg/s por instancia)")
+        self.beat()
+        self.recover_in_flight()
+        while True:
+            try:
+                self.beat()
+                self.recover_stale()
+                self.promote_due_retries()
+                raw = self.redis.blmove(OUTBOX_KEY, self.processing_key, 1, "LEFT", "RIGHT")
+                if raw is None:
+                    continue
+                self.handle(raw)
+                self.redis.lrem(self.processing_key, 1, raw)
+            except Exception as e:
+                print(f"Error en el worker de mensajes: {e}")
+                time.sleep(1)
+
+
+def main():
+    redis_client = Redis.from_url(REDIS_URL, decode_responses=True)
+    # Los reintentos largos los maneja la cola; el cliente solo reintenta fallos de conexión inmediatos
+    greenapi = GreenAPIClient(API_URL_BASE, API_TOKEN, retries=1)
+    rate_limiter = RateLimiter(redis_client, API_INSTANCE, MESSAGES_PER_SECOND)
+    MessageWorker(redis_client, greenapi, rate_limiter).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey, Index, Text, DateTime, func, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey, Index, Text, DateTime, func, TIMESTAMP, LargeBinary, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
+
+def trigram_index(table: str, column: str) -> Index:
+    """Índice GIN de trigramas para búsquedas ILIKE '%texto%' (requiere pg_trgm)."""
+    return Index(
+        f'ix_{table}_{column}_trgm', column,
+        postgresql_using='gin',
+        postgresql_ops={column: 'gin_trgm_ops'}
+    )
+
 class Elector(Base):
     __tablename__ = 'electores'
 
@@ -37,6 +47,10 @@ class Geografico(Base):
     municipio = Column(String(35))
     parroquia = Column(String(35))
 
+    __table_args__ = (
+        Index('ix_geograficos_codigos', 'codigo_estado', 'codigo_municipio', 'codigo_parroquia'),
+    )
+
 class CentroVotacion(Base):
     __tablename__ = 'centros_votacion'
 
@@ -50,6 +64,10 @@ class CentroVotacion(Base):
     nombre_cv = Column(String(255))
     direccion_cv = Column(String(755))
 
+    __table_args__ = (
+        Index('ix_centros_votacion_codificacion_nueva_cv', 'codificacion_nueva_cv'),
+    )
+
 
 class Recolector(Base):
     __tablename__ = 'recolectores'
@@ -65,20 +83,29 @@ class Recolector(Base):
     organizacion_politica = Column(String(50), nullable=True)
     tickets = relationship("Ticket", back_populates="referido")
 
+    # Búsqueda por texto (migración add_trigram_search_indexes)
+    __table_args__ = tuple(trigram_index('recolectores', column) for column in ('nombre', 'cedula', 'telefono'))
+
 class Ticket(Base):
     __tablename__ = 'tickets'
 
     id = Column(Integer, primary_key=True, index=True)
     numero_ticket = Column(String(20), unique=True, index=True)
-    qr_ticket = Column(Text)
     cedula = Column(String(20), unique=True, index=True)  # Añadido unique y index
     nombre = Column(String(100))
     telefono = Column(String(20), unique=True, index=True) 
     estado = Column(String(35))
     municipio = Column(String(35))
     parroquia = Column(String(35))
+    # Códigos del elector, para filtrar por ubicación sin comparar nombres
+    codigo_estado = Column(Integer)
+    codigo_municipio = Column(Integer)
+    codigo_parroquia = Column(Integer)
+    codigo_centro_votacion = Column(Integer)
     referido_id = Column(Integer, ForeignKey('recolectores.id'))
     referido = relationship("Recolector", back_populates="tickets")
+    # La imagen del QR vive en ticket_qr y solo se carga al acceder a ticket.qr
+    qr = relationship("TicketQR", uselist=False, back_populates="ticket", cascade="all, delete-orphan", passive_deletes=True)
     validado = Column(Boolean)
     ganador = Column(Boolean)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -86,8 +113,40 @@ class Ticket(Base):
 
     __table_args__ = (
         Index('ix_ticket_cedula', 'cedula'),  # Creación de índice
+        Index('ix_tickets_codigos_geo', 'codigo_estado', 'codigo_municipio', 'codigo_parroquia'),
+        Index('ix_tickets_codigo_centro_votacion', 'codigo_centro_votacion'),
+        # Índices parciales del sorteo (migración add_ticket_sorteo_indexes)
+        Index('ix_tickets_elegibles_sorteo', 'estado', 'municipio', 'id', postgresql_where=text('validado AND NOT ganador')),
+        Index('ix_tickets_ganadores', 'id', postgresql_where=text('ganador')),
+        # Búsqueda por texto (migración add_trigram_search_indexes)
+        *(trigram_index('tickets', column) for column in ('cedula', 'nombre', 'telefono', 'numero_ticket')),
     )
     
+class TicketQR(Base):
+    __tablename__ = 'ticket_qr'
+
+    ticket_id = Column(Integer, ForeignKey('tickets.id', ondelete='CASCADE'), primary_key=True)
+    qr_png = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    ticket = relationship("Ticket", back_populates="qr")
+
+class Sorteo(Base):
+    """Registro de un sorteo auditable: semilla, ids elegibles y ganadores."""
+    __tablename__ = 'sorteos'
+
+    id = Column(Integer, primary_key=True, index=True)
+    semilla = Column(String(128), nullable=False)
+    estado = Column(String(35), nullable=True)
+    municipio = Column(String(35), nullable=True)
+    cantidad = Column(Integer, nullable=False)
+    total_elegibles = Column(Integer, nullable=False)
+    # Ids elegibles ordenados (uint32, diferencias comprimidas con zlib)
+    snapshot = Column(LargeBinary, nullable=False)
+    snapshot_hash = Column(String(64), nullable=False)
+    ganadores = Column(ARRAY(Integer), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 # Agregar la columna 'email' a la definición de la tabla users
 
 class Users(Base):
@@ -133,4 +192,10 @@ class Emprendedor(Base):
     municipio = Column(String(50), nullable=True)
     motivo = Column(String(255), nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(TIMESTAMP(timezone=True), onupdate=func.now(), nullable=True)
\ No newline at end of file
+    updated_at = Column(TIMESTAMP(timezone=True), onupdate=func.now(), nullable=True)
+
+    # Búsqueda por texto (migración add_trigram_search_indexes)
+    __table_args__ = tuple(
+        trigram_index('emprendedores', column)
+        for column in ('cedula', 'nombre_apellido', 'nombre_emprendimiento', 'telefono')
+    )
@@ -0,0 +1,43 @@
+"""
+Recalcula la vista materializada elector_stats y descarta las
+estadísticas cacheadas del panel (/api/stats/...).
+
+bulk_load lo hace al terminar cada carga; este comando sirve después de
+cargas por otros medios o para el primer llenado tras la migración.
+
+Uso:
+    python -m app.refresh_elector_stats
+"""
+import os
+import time
+import argparse
+import logging
+
+from redis import Redis
+
+from app.database import engine
+from app.utils.elector_stats import refresh_elector_stats, invalidate_stats_sync
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6380/0")
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def refresh_stats():
+    start = time.perf_counter()
+    refresh_elector_stats(engine)
+    logging.info(f"elector_stats actualizada en {time.perf_counter() - start:.1f}s")
+    try:
+        invalidate_stats_sync(Redis.from_url(REDIS_URL))
+    except Exception as e:
+        logging.warning(f"No se pudo invalidar el cache de estadísticas: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+    refresh_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -72,13 +72,16 @@ class ElectorDetail(BaseModel):
 
 class TicketBase(BaseModel):
     numero_ticket: Optional[str]
-    qr_ticket: Optional[str]
     cedula: Optional[str]
     nombre: Optional[str]
     telefono: Optional[str]
     estado: Optional[str]
     municipio: Optional[str]
     parroquia: Optional[str]
+    codigo_estado: Optional[int] = None
+    codigo_municipio: Optional[int] = None
+    codigo_parroquia: Optional[int] = None
+    codigo_centro_votacion: Optional[int] = None
     referido_id: Optional[int]
     validado: Optional[bool]
     ganador: Optional[bool]
@@ -1,11 +1,9 @@
 import os
 import sys
 import logging
-import asyncio
 import base64
 import re
 import time
-import qrcode
 from io import BytesIO
 import requests
 from pathlib import Path
@@ -25,8 +23,8 @@ from telegram.ext import (
     Updater, CommandHandler, MessageHandler, Filters, 
     CallbackContext, CallbackQueryHandler, ConversationHandler
 )
-from app.main import get_db, send_qr_code, obtener_numero_contacto, verificar_cedula
-from app.schemas import CedulaRequest
+from app.database import read_session, wait_for_database
+from app.utils.elector_lookup import verify_cedula
 
 # Estados para el ConversationHandler
 ESPERANDO_CEDULA, ESPERANDO_TELEFONO, MENU_POST_REGISTRO, MENU_PRINCIPAL = range(4)
@@ -265,13 +263,13 @@ def start(update: Update, context: CallbackContext) -> int:
         # Si encontramos una cédula en el mensaje, procesarla directamente
         logger.info(f"Cédula encontrada en comando /start: {cedula}")
         context.user_data['cedula'] = cedula
-        return asyncio.run(procesar_cedula(update, context))
+        return procesar_cedula(update, context)
     
     # Si no hay cédula, mostrar menú principal directamente
     logger.info(f"Mostrando menú principal para {user.first_name}")
     return mostrar_menu_principal(update, context)
 
-async def procesar_cedula(update: Update, context: CallbackContext) -> int:
+def procesar_cedula(update: Update, context: CallbackContext) -> int:
     """Procesar la cédula ingresada por el usuario"""
     # Obtener la cédula del mensaje o del contexto si viene de /start
     cedula = context.user_data.get('cedula')
@@ -300,12 +298,12 @@ async def procesar_cedula(update: Update, context: CallbackContext) -> int:
         return mostrar_menu_principal(update, context)
     
     # Obtener conexión a la base de datos
-    db = next(get_db())
+    db = read_session()
     
     try:
         # 1. Primero verificamos si la cédula existe en la base de datos de electores
         logger.info(f"Verificando cédula {cedula} en la base de datos")
-        elector_response = await verificar_cedula(CedulaRequest(numero_cedula=cedula), db)
+        elector_response = verify_cedula(db, cedula) or {}
         logger.info(f"Respuesta verificación elector: {elector_response}")
         
         if not elector_response.get("elector"):
@@ -364,8 +362,9 @@ async def procesar_cedula(update: Update, context: CallbackContext) -> int:
                 logger.info(f"Ticket encontrado: ID: {existing_ticket.get('id')}")
                 
                 # Extraer el QR del ticket
-                qr_code_base64 = existing_ticket["qr_ticket"]
-                qr_bytes = base64.b64decode(qr_code_base64)
+                qr_response = requests.get(f"{NEXT_PUBLIC_API_URL}/api/tickets/{existing_ticket['id']}/qr.png")
+                qr_response.raise_for_status()
+                qr_bytes = qr_response.content
                 
                 # Mensaje de bienvenida
                 message = f"{nombre_completo}, hoy es tu día de suerte!\n\n" \
@@ -588,6 +587,8 @@ def registrar_usuario(update: Update, context: CallbackContext) -> int:
             logger.info(f"Generando QR para enlace de WhatsApp: {whatsapp_link}")
             try:
                 # Crear código QR
+                import qrcode
+
                 qr = qrcode.QRCode(
                     version=1,
                     error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -838,7 +839,7 @@ def mensaje_cedula(update: Update, context: CallbackContext) -> int:
     if cedula:
         logger.info(f"Cédula extraída del mensaje: {cedula}")
         context.user_data['cedula'] = cedula
-        return asyncio.run(procesar_cedula(update, context))
+        return procesar_cedula(update, context)
     else:
         # Si no se identifica una cédula, informar al usuario
         update.message.reply_text(
@@ -1002,6 +1003,9 @@ def main():
     logging.getLogger('telegram.ext').setLevel(logging.INFO)
     
     logger.info(f"Iniciando bot de Telegram con token: {TELEGRAM_TOKEN[:6]}...")
+
+    # Falla el arranque (y docker reinicia) si la base no responde tras los reintentos
+    wait_for_database()
     
     # Crear el updater con un nivel de polling más agresivo
     updater = Updater(TELEGRAM_TOKEN)
@@ -0,0 +1,157 @@
+import json
+import time
+import uuid
+import random
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from prometheus_client import Counter
+
+# Resultados posibles de una lectura:
+# hit / negative_hit: valor vigente (negative_hit = "no existe" cacheado)
+# stale: valor vencido servido mientras otro lo recalcula
+# miss: no estaba; se cargó (o se esperó a quien lo estaba cargando)
+# error: Redis no respondió y se fue directo a la base de datos
+CACHE_REQUESTS = Counter(
+    "app_cache_requests",
+    "Lecturas de los caches de Redis por resultado",
+    labelnames=["cache", "result"]
+)
+
+# Borra el lock solo si sigue siendo nuestro (otro proceso pudo tomarlo al vencer)
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class CachedLoader:
+    """
+    get-or-load sobre Redis que evita la estampida al vencer una llave.
+
+    - Single-flight: dentro del proceso las peticiones simultáneas por la
+      misma llave comparten una sola carga; entre procesos un lock SET NX
+      deja cargar a uno y los demás esperan a que aparezca el valor.
+    - Stale-while-revalidate: la llave vive `stale_ttl` segundos más que el
+      valor; pasado el TTL se sigue sirviendo el dato viejo y se recalcula en
+      segundo plano.
+    - TTL con jitter para que las llaves creadas juntas no venzan juntas.
+    - Cache negativo: si `negative_ttl` está definido, un None ("no existe")
+      también se guarda, por menos tiempo.
+
+    Los loaders se ejecutan fuera de la petición (la recarga en segundo plano
+    termina después de responder), así que deben abrir su propia sesión.
+    """
+
+    def __init__(self, redis_client, name: str, ttl: int, negative_ttl: Optional[int] = None,
+                 stale_ttl: int = 300, jitter: float = 0.1, lock_ttl: int = 30,
+                 wait_timeout: float = 5.0, default: Optional[Callable] = None):
+        self.redis = redis_client
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.jitter = jitter
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.default = default
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._release_lock = redis_client.register_script(_RELEASE_LOCK)
+
+    def _jittered(self, ttl: int) -> int:
+        return max(1, int(ttl * random.uniform(1 - self.jitter, 1 + self.jitter)))
+
+    async def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.get(key)
+        if not raw:
+            return None
+        entry = json.loads(raw)
+        # Llaves escritas con el formato anterior (valor sin envoltura): se recargan
+        if not isinstance(entry, dict) or "exp" not in entry:
+            return None
+        return entry
+
+    async def _write(self, key: str, value: Any):
+        if value is None and self.negative_ttl is None:
+            return
+        ttl = self._jittered(self.ttl if value is not None else self.negative_ttl)
+        entry = {"v": value, "exp": time.time() + ttl}
+        await self.redis.set(key, json.dumps(entry, default=self.default), ex=ttl + self.stale_ttl)
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            entry = await self._read(key)
+        except Exception as e:
+            print(f"Error leyendo cache {self.name}: {e}")
+            CACHE_REQUESTS.labels(cache=self.name, result="error").inc()
+            return await loader()
+
+        if entry is not None:
+            if entry["exp"] > time.time():
+                result = "hit" if entry["v"] is not None else "negative_hit"
+                CACHE_REQUESTS.labels(cache=self.name, result=result).inc()
+                return entry["v"]
+            CACHE_REQUESTS.labels(cache=self.name, result="stale").inc()
+            if key not in self._inflight:
+                self._single_flight(key, loader, wait=False)
+            return entry["v"]
+
+        CACHE_REQUESTS.labels(cache=self.name, result="miss").inc()
+        return await asyncio.shield(self._single_flight(key, loader, wait=True))
+
+    def _single_flight(self, key: str, loader, wait: bool) -> asyncio.Future:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, wait))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            task.add_done_callback(self._log_failure)
+        return task
+
+    def _log_failure(self, task: asyncio.Future):
+        # Las recargas en segundo plano no tienen a nadie esperando el error
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error cargando cache {self.name}: {task.exception()}")
+
+    async def _load(self, key: str, loader, wait: bool) -> Any:
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis.set(lock_key, token, nx=True, ex=self.lock_ttl)
+        except Exception as e:
+            print(f"Error tomando lock de cache {self.name}: {e}")
+            acquired = False
+
+        if not acquired:
+            if not wait:
+                # Otro proceso ya está recalculando el valor vencido
+                return None
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                try:
+                    entry = await self._read(key)
+                except Exception:
+                    break
+                if entry is not None:
+                    return entry["v"]
+            # Quien tenía el lock no terminó a tiempo: se carga sin lock
+            return await loader()
+
+        try:
+            value = await loader()
+            try:
+                await self._write(key, value)
+            except Exception as e:
+                print(f"Error guardando cache {self.name}: {e}")
+            return value
+        finally:
+            try:
+                await self._release_lock(keys=[lock_key], args=[token])
+            except Exception as e:
+                print(f"Error liberando lock de cache {self.name}: {e}")
+
+    async def invalidate(self, key: str):
+        await self.redis.delete(key)
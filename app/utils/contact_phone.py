@@ -0,0 +1,30 @@
+import random
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import LineaTelefonica
+from app.utils.greenapi_client import GreenAPIClient
+
+
+def obtener_numero_instancia_sync(greenapi: GreenAPIClient) -> Optional[str]:
+    try:
+        data = greenapi.get_settings_sync()
+        return data["wid"]
+    except Exception:
+        return None
+
+
+def obtener_numero_contacto(db: Session, greenapi: GreenAPIClient) -> Optional[str]:
+    """
+    Número de contacto para los participantes: una de las líneas
+    registradas o, si no hay, el número de la instancia de GreenAPI.
+    Vive fuera de app.main para que los bots no importen la API completa.
+    """
+    try:
+        phone_contacts = db.query(LineaTelefonica.numero).all()
+        if phone_contacts:
+            return random.choice(phone_contacts)[0]
+        return obtener_numero_instancia_sync(greenapi)
+    except Exception:
+        return obtener_numero_instancia_sync(greenapi)
@@ -0,0 +1,207 @@
+import json
+import hashlib
+from itertools import combinations
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.executors import run_io
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+COUNT_MODE_PATTERN = "^(exact|estimate|none)$"
+
+# Los contadores se corrigen solos con el tiempo aunque se pierda algún incremento
+COUNT_TTL_SECONDS = 3600
+
+# Suma delta solo si el contador ya existe: un filtro que nadie ha pedido
+# no se cachea con un valor parcial
+_INCR_IF_EXISTS = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('INCRBY', key, ARGV[1])
+    end
+end
+return 0
+"""
+
+
+def _active(filters: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in filters.items() if v is not None and v != ""}
+
+
+def _canonical(filters: Dict[str, Any]) -> str:
+    payload = json.dumps({k: str(v) for k, v in sorted(_active(filters).items())}, separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+TABLE_ESTIMATE_SQL = text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table")
+
+
+def _reltuples(value) -> Optional[int]:
+    # -1: la tabla nunca se analizó
+    if value is None or value < 0:
+        return None
+    return int(value)
+
+
+def _explain(statement):
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    return text(f"EXPLAIN (FORMAT JSON) {sql}")
+
+
+def _plan_rows(plan) -> int:
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def table_estimate(db: Session, table: str) -> Optional[int]:
+    """Filas estimadas por las estadísticas de Postgres (None si la tabla nunca se analizó)."""
+    return _reltuples(db.execute(TABLE_ESTIMATE_SQL, {"table": table}).scalar())
+
+
+def plan_estimate(db: Session, query) -> int:
+    """Filas que el planificador espera para la consulta filtrada (EXPLAIN, sin ejecutarla)."""
+    return _plan_rows(db.execute(_explain(query.statement)).scalar())
+
+
+async def table_estimate_async(db: AsyncSession, table: str) -> Optional[int]:
+    return _reltuples((await db.execute(TABLE_ESTIMATE_SQL, {"table": table})).scalar())
+
+
+async def plan_estimate_async(db: AsyncSession, stmt) -> int:
+    return _plan_rows((await db.execute(_explain(stmt))).scalar())
+
+
+class TableCounter:
+    """
+    Totales de los listados paginados de una tabla.
+
+    - exact: contador en Redis por combinación de filtros; se calcula con
+      COUNT(*) la primera vez y luego se mantiene con record_insert /
+      record_delete. Las consultas con texto libre no se cachean.
+    - estimate: pg_class.reltuples sin filtros, estimación del planificador con filtros.
+    - none: no se cuenta.
+
+    `dimensions` son las columnas por las que se filtra con igualdad; al
+    insertar o borrar una fila se ajustan todos los contadores cacheados de
+    los subconjuntos de filtros que la incluyen.
+    """
+
+    def __init__(self, redis_client, table: str, dimensions: Iterable[str], ttl: int = COUNT_TTL_SECONDS):
+        self.redis = redis_client
+        self.table = table
+        self.dimensions = tuple(dimensions)
+        self.ttl = ttl
+        self.version_key = f"count:{table}:version"
+        self._incr_if_exists = redis_client.register_script(_INCR_IF_EXISTS)
+
+    async def _version(self) -> str:
+        return await self.redis.get(self.version_key) or "0"
+
+    def _key(self, version: str, filters: Dict[str, Any]) -> str:
+        return f"count:{self.table}:v{version}:{_canonical(filters)}"
+
+    async def count(self, db: Session, query, filters: Dict[str, Any], mode: str = COUNT_EXACT,
+                    cacheable: bool = True) -> Optional[int]:
+        """
+        Total de una Query del ORM con sesión síncrona. Las consultas a la
+        base corren en el pool de run_io para no bloquear el event loop.
+        """
+        async def exact():
+            return await run_io(query.count)
+
+        async def estimate_table():
+            return await run_io(table_estimate, db, self.table)
+
+        async def estimate_plan():
+            return await run_io(plan_estimate, db, query)
+
+        return await self._count(filters, mode, cacheable, exact, estimate_table, estimate_plan)
+
+    async def count_async(self, db: AsyncSession, stmt, filters: Dict[str, Any], mode: str = COUNT_EXACT,
+                          cacheable: bool = True) -> Optional[int]:
+        """Total de un select() con AsyncSession."""
+        async def exact():
+            count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+            return (await db.execute(count_stmt)).scalar()
+
+        async def estimate_table():
+            return await table_estimate_async(db, self.table)
+
+        async def estimate_plan():
+            return await plan_estimate_async(db, stmt)
+
+        return await self._count(filters, mode, cacheable, exact, estimate_table, estimate_plan)
+
+    async def _count(self, filters, mode, cacheable, exact, estimate_table, estimate_plan) -> Optional[int]:
+        if mode == COUNT_NONE:
+            return None
+
+        if mode == COUNT_ESTIMATE:
+            if not _active(filters) and cacheable:
+                estimate = await estimate_table()
+                if estimate is not None:
+                    return estimate
+            return await estimate_plan()
+
+        if not cacheable:
+            return await exact()
+
+        try:
+            key = self._key(await self._version(), filters)
+            cached = await self.redis.get(key)
+        except Exception as e:
+            print(f"Error leyendo contador de {self.table}: {e}")
+            return await exact()
+        if cached is not None:
+            return int(cached)
+
+        total = await exact()
+        try:
+            await self.redis.set(key, total, ex=self.ttl)
+        except Exception as e:
+            print(f"Error guardando contador de {self.table}: {e}")
+        return total
+
+    async def _adjust(self, row: Dict[str, Any], delta: int):
+        values = {d: row.get(d) for d in self.dimensions if row.get(d) is not None and row.get(d) != ""}
+        try:
+            version = await self._version()
+            keys = [
+                self._key(version, dict(subset))
+                for size in range(len(values) + 1)
+                for subset in combinations(sorted(values.items()), size)
+            ]
+            await self._incr_if_exists(keys=keys, args=[delta])
+        except Exception as e:
+            # Sin Redis el contador quedará desfasado hasta que venza el TTL
+            print(f"Error actualizando contadores de {self.table}: {e}")
+
+    def dimensions_changed(self, changes: Dict[str, Any]) -> bool:
+        """True si una actualización toca alguna columna de filtro (los contadores dejan de ser válidos)."""
+        return any(d in changes for d in self.dimensions)
+
+    async def record_insert(self, row: Dict[str, Any]):
+        await self._adjust(row, 1)
+
+    async def record_delete(self, row: Dict[str, Any]):
+        await self._adjust(row, -1)
+
+    async def invalidate(self):
+        """Descarta todos los contadores de la tabla (actualizaciones masivas o cambios de filtros)."""
+        try:
+            await self.redis.incr(self.version_key)
+        except Exception as e:
+            print(f"Error invalidando contadores de {self.table}: {e}")
+
+
+def invalidate_counts_sync(redis_client, table: str):
+    """Versión para procesos sin event loop (cargas masivas)."""
+    redis_client.incr(f"count:{table}:version")
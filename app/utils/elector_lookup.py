@@ -0,0 +1,108 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Elector, CentroVotacion, Geografico
+
+
+def _row_to_dict(obj) -> Optional[Dict[str, Any]]:
+    if obj is None:
+        return None
+    return {c.key: getattr(obj, c.key) for c in obj.__table__.columns}
+
+
+def elector_detail_query(numero_cedula: int):
+    """
+    Construye la consulta que resuelve elector, centro de votación y datos
+    geográficos en un solo viaje a la base de datos.
+
+    Se usan LEFT JOIN para que un elector sin centro o sin registro geográfico
+    siga devolviéndose (con esas secciones en None), igual que antes.
+    """
+    return (
+        select(Elector, CentroVotacion, Geografico)
+        .outerjoin(
+            CentroVotacion,
+            CentroVotacion.codificacion_nueva_cv == Elector.codigo_centro_votacion
+        )
+        .outerjoin(
+            Geografico,
+            and_(
+                Geografico.codigo_estado == Elector.codigo_estado,
+                Geografico.codigo_municipio == Elector.codigo_municipio,
+                Geografico.codigo_parroquia == Elector.codigo_parroquia
+            )
+        )
+        .where(Elector.numero_cedula == numero_cedula)
+        .limit(1)
+    )
+
+
+def build_elector_detail(row) -> Optional[Dict[str, Any]]:
+    """Convierte una fila (Elector, CentroVotacion, Geografico) al payload de ElectorDetail."""
+    if row is None:
+        return None
+    elector, centro_votacion, geografico = row
+    return {
+        "elector": _row_to_dict(elector),
+        "centro_votacion": _row_to_dict(centro_votacion),
+        "geografico": _row_to_dict(geografico)
+    }
+
+
+def fetch_elector_detail(db: Session, numero_cedula: int) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene el detalle completo de un elector por número de cédula.
+
+    Args:
+        db (Session): Sesión de base de datos
+        numero_cedula (int): Número de cédula del elector
+
+    Returns:
+        Optional[Dict[str, Any]]: Diccionario con las llaves "elector",
+        "centro_votacion" y "geografico", o None si la cédula no existe
+    """
+    row = db.execute(elector_detail_query(numero_cedula)).first()
+    return build_elector_detail(row)
+
+
+async def fetch_elector_detail_async(db: AsyncSession, numero_cedula: int) -> Optional[Dict[str, Any]]:
+    """Igual que fetch_elector_detail, con una sesión asíncrona (asyncpg)."""
+    row = (await db.execute(elector_detail_query(numero_cedula))).first()
+    return build_elector_detail(row)
+
+
+# --- Verificación de cédula ---
+# Misma consulta en las dos variantes: la síncrona para los bots y los
+# handlers que ya usan una Session (sin crear un event loop por llamada),
+# la asíncrona para los endpoints con AsyncSession.
+
+# numero_cedula es INTEGER: más de 9 dígitos no puede existir
+MAX_CEDULA_DIGITS = 9
+
+
+def parse_cedula(value) -> Optional[int]:
+    """Número de cédula a partir de "V-12.345.678", "12345678", 12345678...; None si no es válido."""
+    if isinstance(value, int):
+        return value if value > 0 else None
+    digits = "".join(ch for ch in str(value or "") if ch.isdigit())
+    if not digits or len(digits) > MAX_CEDULA_DIGITS:
+        return None
+    return int(digits)
+
+
+def verify_cedula(db: Session, cedula) -> Optional[Dict[str, Any]]:
+    """Detalle del elector (ver fetch_elector_detail) o None si la cédula no está autorizada."""
+    numero_cedula = parse_cedula(cedula)
+    if numero_cedula is None:
+        return None
+    return fetch_elector_detail(db, numero_cedula)
+
+
+async def verify_cedula_async(db: AsyncSession, cedula) -> Optional[Dict[str, Any]]:
+    numero_cedula = parse_cedula(cedula)
+    if numero_cedula is None:
+        return None
+    return await fetch_elector_detail_async(db, numero_cedula)
@@ -0,0 +1,104 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import column, func, select, table, text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Vista materializada creada en la migración add_elector_stats_rollup:
+# un conteo por centro de votación, sexo y rango de edad. Las estadísticas
+# del panel se agregan sobre ella y nunca tocan la tabla electores.
+elector_stats = table(
+    "elector_stats",
+    column("codigo_estado"),
+    column("codigo_municipio"),
+    column("codigo_parroquia"),
+    column("codigo_centro_votacion"),
+    column("sexo"),
+    column("rango_edad"),
+    column("total"),
+)
+
+# Cada nivel agrupa por su código y el de todos sus padres, así los
+# municipios o parroquias con el mismo código en distintos estados no se mezclan
+STAT_LEVELS = {
+    "estado": ["codigo_estado"],
+    "municipio": ["codigo_estado", "codigo_municipio"],
+    "parroquia": ["codigo_estado", "codigo_municipio", "codigo_parroquia"],
+    "centro_votacion": ["codigo_estado", "codigo_municipio", "codigo_parroquia", "codigo_centro_votacion"],
+}
+
+SEXOS = ["M", "F"]
+RANGOS_EDAD = ["18-25", "26-35", "36-45", "46-55", "56-65", "66+", "sin_dato"]
+
+STATS_VERSION_KEY = "stats:version"
+
+
+def stats_query(stat_type: str, codigo_estado: Optional[int] = None,
+                codigo_municipio: Optional[int] = None, codigo_parroquia: Optional[int] = None):
+    """
+    Totales por `stat_type`, con desglose por sexo y rango de edad.
+
+    Los códigos padres que se pasen limitan el resultado (drill-down:
+    estado -> municipios del estado -> parroquias del municipio -> centros).
+    """
+    group_columns = [elector_stats.c[name] for name in STAT_LEVELS[stat_type]]
+    total = elector_stats.c.total
+
+    stmt = select(
+        *group_columns,
+        func.sum(total).label("count"),
+        *[func.sum(total).filter(elector_stats.c.sexo == sexo).label(f"sexo_{sexo}") for sexo in SEXOS],
+        *[func.sum(total).filter(elector_stats.c.rango_edad == rango).label(f"edad_{rango}") for rango in RANGOS_EDAD],
+    )
+    for name, value in (("codigo_estado", codigo_estado), ("codigo_municipio", codigo_municipio),
+                        ("codigo_parroquia", codigo_parroquia)):
+        if value is not None:
+            stmt = stmt.where(elector_stats.c[name] == value)
+    return stmt.group_by(*group_columns).order_by(*group_columns)
+
+
+def build_stats(stat_type: str, rows) -> List[Dict[str, Any]]:
+    levels = STAT_LEVELS[stat_type]
+    stats = []
+    for row in rows:
+        item = {name: row[name] for name in levels}
+        item["key"] = row[levels[-1]]
+        item["count"] = int(row["count"])
+        item["sexo"] = {sexo: int(row[f"sexo_{sexo}"] or 0) for sexo in SEXOS}
+        item["edades"] = {rango: int(row[f"edad_{rango}"] or 0) for rango in RANGOS_EDAD}
+        stats.append(item)
+    return stats
+
+
+def query_stats(db: Session, stat_type: str, codigo_estado: Optional[int] = None,
+                codigo_municipio: Optional[int] = None,
+                codigo_parroquia: Optional[int] = None) -> List[Dict[str, Any]]:
+    stmt = stats_query(stat_type, codigo_estado, codigo_municipio, codigo_parroquia)
+    return build_stats(stat_type, db.execute(stmt).mappings())
+
+
+async def query_stats_async(db: AsyncSession, stat_type: str, codigo_estado: Optional[int] = None,
+                            codigo_municipio: Optional[int] = None,
+                            codigo_parroquia: Optional[int] = None) -> List[Dict[str, Any]]:
+    stmt = stats_query(stat_type, codigo_estado, codigo_municipio, codigo_parroquia)
+    return build_stats(stat_type, (await db.execute(stmt)).mappings())
+
+
+def refresh_elector_stats(engine):
+    """
+    Recalcula la vista. CONCURRENTLY deja leerla mientras se actualiza,
+    pero solo se puede usar cuando ya tiene datos (la migración la crea vacía).
+    """
+    with engine.begin() as conn:
+        populated = conn.execute(
+            text("SELECT ispopulated FROM pg_matviews WHERE matviewname = 'elector_stats'")
+        ).scalar()
+        if populated:
+            conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY elector_stats"))
+        else:
+            conn.execute(text("REFRESH MATERIALIZED VIEW elector_stats"))
+
+
+def invalidate_stats_sync(redis_client):
+    """Descarta las estadísticas cacheadas en Redis después de un refresh."""
+    redis_client.incr(STATS_VERSION_KEY)
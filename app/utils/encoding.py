@@ -0,0 +1,133 @@
+import os
+import json
+import threading
+from typing import Dict, Optional
+
+import chardet
+from chardet.universaldetector import UniversalDetector
+
+# Bytes leídos desde el inicio del archivo
+HEAD_SAMPLE_SIZE = 512 * 1024
+# Ventanas adicionales repartidas por el resto del archivo, para no
+# concluir "ascii" cuando los acentos aparecen más adelante
+WINDOW_COUNT = 4
+WINDOW_SIZE = 128 * 1024
+CACHE_FILENAME = ".encoding_cache.json"
+
+_memory_cache: Dict[str, str] = {}
+_cache_lock = threading.Lock()
+
+
+def file_fingerprint(file_path: str) -> str:
+    stat = os.stat(file_path)
+    return f"{os.path.abspath(file_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def _cache_path(file_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_FILENAME)
+
+
+def _read_disk_cache(file_path: str) -> Dict[str, str]:
+    try:
+        with open(_cache_path(file_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_disk_cache(file_path: str, fingerprint: str, encoding: str):
+    path = _cache_path(file_path)
+    try:
+        cache = _read_disk_cache(file_path)
+        cache[fingerprint] = encoding
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Directorio de solo lectura: nos quedamos con el cache en memoria
+        pass
+
+
+def sample_encoding(file_path: str, head_size: int = HEAD_SAMPLE_SIZE,
+                    windows: int = WINDOW_COUNT, window_size: int = WINDOW_SIZE) -> Optional[str]:
+    """
+    Detecta la codificación leyendo como máximo head_size + windows * window_size
+    bytes, sin importar el tamaño del archivo.
+    """
+    size = os.path.getsize(file_path)
+    detector = UniversalDetector()
+    with open(file_path, 'rb') as f:
+        detector.feed(f.read(head_size))
+        if not detector.done and size > head_size:
+            step = (size - head_size) // (windows + 1)
+            for i in range(1, windows + 1):
+                f.seek(head_size + step * i)
+                f.readline()  # Alinear al inicio de una línea
+                detector.feed(f.read(window_size))
+                if detector.done:
+                    break
+    detector.close()
+    encoding = detector.result.get('encoding')
+
+    # Un prefijo puramente ASCII se lee como UTF-8 (que lo contiene)
+    if encoding is None or encoding.lower() == 'ascii':
+        return 'utf-8'
+    return encoding
+
+
+def detect_encoding(file_path: str) -> str:
+    """
+    Codificación de un archivo, calculada una sola vez por huella
+    (ruta, tamaño, fecha de modificación). El resultado se guarda en memoria
+    y en un .encoding_cache.json junto al archivo, para las siguientes cargas.
+    """
+    fingerprint = file_fingerprint(file_path)
+    with _cache_lock:
+        if fingerprint in _memory_cache:
+            return _memory_cache[fingerprint]
+
+    encoding = _read_disk_cache(file_path).get(fingerprint)
+    if encoding is None:
+        encoding = sample_encoding(file_path)
+        _write_disk_cache(file_path, fingerprint, encoding)
+
+    with _cache_lock:
+        _memory_cache[fingerprint] = encoding
+    return encoding
+
+
+def redetect_encoding(file_path: str, failed: str) -> str:
+    """
+    Para cuando `failed` (la codificación detectada por muestreo) no pudo
+    decodificar el archivo: analiza el archivo completo por bloques y
+    reemplaza la entrada del cache. Si el análisis completo repite la misma
+    codificación se usa latin-1, que acepta cualquier byte.
+    """
+    detector = UniversalDetector()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(WINDOW_SIZE), b''):
+            detector.feed(chunk)
+            if detector.done:
+                break
+    detector.close()
+    encoding = detector.result.get('encoding') or 'latin-1'
+    if encoding.lower() in ('ascii', failed.lower()):
+        encoding = 'latin-1'
+
+    fingerprint = file_fingerprint(file_path)
+    _write_disk_cache(file_path, fingerprint, encoding)
+    with _cache_lock:
+        _memory_cache[fingerprint] = encoding
+    return encoding
+
+
+def detect_encoding_full(file_path: str) -> Optional[str]:
+    """Detección anterior sobre el archivo completo; solo para comparar en el benchmark."""
+    with open(file_path, 'rb') as f:
+        return chardet.detect(f.read())['encoding']
+
+
+def open_text(file_path: str):
+    """Abre el archivo en modo texto con la codificación detectada, decodificando por bloques."""
+    return open(file_path, 'r', encoding=detect_encoding(file_path), newline='')
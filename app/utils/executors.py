@@ -0,0 +1,119 @@
+import os
+import time
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from prometheus_client import Histogram
+
+# Hilos para trabajo que espera E/S o libera el GIL (lectura de archivos,
+# pandas.read_excel, consultas síncronas largas). Procesos para trabajo de
+# CPU puro en Python (armar xlsx, comprimir, hashes de contraseñas): en un
+# hilo seguiría compitiendo por el GIL con el event loop.
+IO_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", 16))
+CPU_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Intervalo del monitor y bloqueo a partir del cual se reporta una petición
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", 0.05))
+LOOP_LAG_WARNING = float(os.getenv("LOOP_LAG_WARNING", 0.2))
+
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Retraso del event loop medido por el monitor",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+REQUEST_LOOP_BLOCKED = Histogram(
+    "request_event_loop_blocked_seconds",
+    "Tiempo que el event loop estuvo bloqueado mientras la petición estaba en curso",
+    labelnames=["path"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+_cpu_executor: Optional[ProcessPoolExecutor] = None
+
+
+def io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+    return _io_executor
+
+
+def cpu_executor() -> ProcessPoolExecutor:
+    # Se crea al primer uso para no arrancar procesos en scripts que no los necesitan
+    global _cpu_executor
+    if _cpu_executor is None:
+        _cpu_executor = ProcessPoolExecutor(max_workers=CPU_WORKERS)
+    return _cpu_executor
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Ejecuta `func` en el pool de hilos sin bloquear el event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def run_cpu(func: Callable, *args, **kwargs) -> Any:
+    """
+    Ejecuta `func` en el pool de procesos. `func` y sus argumentos deben
+    poder serializarse con pickle (funciones de módulo, datos simples).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(cpu_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executors():
+    global _io_executor, _cpu_executor
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=False)
+        _io_executor = None
+    if _cpu_executor is not None:
+        _cpu_executor.shutdown(wait=False, cancel_futures=True)
+        _cpu_executor = None
+
+
+class LoopLagMonitor:
+    """
+    Mide cuánto tiempo estuvo bloqueado el event loop.
+
+    Una tarea duerme `interval` segundos y registra cuánto tarde despertó.
+    `blocked()` es el tiempo bloqueado acumulado, incluido el bloqueo en
+    curso que la tarea todavía no pudo registrar; la diferencia entre dos
+    lecturas es cuánto estuvo bloqueado el loop entre ellas (por esta u
+    otra petición concurrente).
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self._accumulated = 0.0
+        self._expected: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            self._expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - self._expected)
+            self._accumulated += lag
+            LOOP_LAG.observe(lag)
+
+    def blocked(self) -> float:
+        pending = 0.0
+        if self._expected is not None:
+            pending = max(0.0, time.monotonic() - self._expected)
+        return self._accumulated + pending
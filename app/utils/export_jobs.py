@@ -0,0 +1,264 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from redis import Redis as SyncRedis
+
+from app.utils.exports import stream_zip
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "lottobueno_exports"))
+# Tiempo durante el cual un archivo generado se reutiliza para los mismos filtros
+EXPORT_CACHE_TTL = int(os.getenv("EXPORT_CACHE_TTL", "900"))
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+# Mientras un trabajo está en cola o en curso, su proceso renueva una llave
+# de latido; si el proceso muere la llave vence y el trabajo se da por
+# interrumpido (y una solicitud igual vuelve a generarlo).
+EXPORT_HEARTBEAT_INTERVAL = int(os.getenv("EXPORT_HEARTBEAT_INTERVAL", "15"))
+EXPORT_STALE_AFTER = int(os.getenv("EXPORT_STALE_AFTER", "60"))
+
+# Estados de un trabajo de exportación
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+ERROR = "error"
+
+
+class ExportProgress:
+    """
+    Lleva la cuenta de filas escritas por un trabajo y la publica en Redis.
+
+    Las escrituras a Redis se agrupan (como máximo una cada
+    `flush_interval` segundos) para no agregar un viaje por fila.
+    """
+
+    def __init__(self, manager: "ExportJobManager", job_id: str, flush_interval: float = 1.0):
+        self.manager = manager
+        self.job_id = job_id
+        self.flush_interval = flush_interval
+        self.total = 0
+        self.processed = 0
+        self.extra: Dict[str, Any] = {}
+        self._last_flush = 0.0
+
+    def set_total(self, total: int):
+        self.total = total or 0
+        self.flush(force=True)
+
+    def update(self, **fields):
+        self.extra.update(fields)
+        self.flush()
+
+    def track(self, rows: Iterable) -> Iterator:
+        """Envuelve un iterador de filas contando cada fila entregada."""
+        for row in rows:
+            self.processed += 1
+            yield row
+            if self.processed % 1000 == 0:
+                self.flush()
+
+    def percent(self) -> float:
+        if not self.total:
+            return 0
+        # El 100 se reserva para cuando el archivo queda cerrado en disco
+        return min(99.0, round(self.processed * 100 / self.total, 2))
+
+    def flush(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        self.manager.update_job(
+            self.job_id,
+            progreso=self.percent(),
+            total_registros=self.total,
+            registros_procesados=self.processed,
+            **self.extra
+        )
+
+
+class ExportJobManager:
+    """
+    Ejecuta exportaciones en un pool de hilos y guarda el ZIP resultante en
+    disco.
+
+    El estado de cada trabajo vive en Redis bajo `download:{job_id}`; los
+    endpoints de progreso lo leen con get_job, que además detecta los
+    trabajos sin latido. Dos solicitudes con
+    el mismo tipo y filtros dentro de EXPORT_CACHE_TTL comparten trabajo y
+    archivo, salvo que el trabajo haya quedado sin latido.
+
+    Los métodos usan un cliente Redis síncrono: desde un handler async se
+    llaman con run_io.
+    """
+
+    def __init__(self, redis_url: str, session_factory: Callable, max_workers: int = EXPORT_WORKERS,
+                 export_dir: str = EXPORT_DIR, cache_ttl: int = EXPORT_CACHE_TTL):
+        self.redis = SyncRedis.from_url(redis_url, decode_responses=True)
+        self.session_factory = session_factory
+        self.export_dir = export_dir
+        self.cache_ttl = cache_ttl
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self.builders: Dict[str, Callable] = {}
+        self._inflight = set()
+        self._inflight_lock = threading.Lock()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        os.makedirs(self.export_dir, exist_ok=True)
+
+    def register(self, tipo: str, builder: Callable):
+        """
+        Registra el generador de un tipo de exportación. `builder(db, params,
+        progress)` devuelve (nombre del zip, entradas) donde las entradas son
+        pares (nombre dentro del zip, bloques de bytes) como los de stream_zip.
+        """
+        self.builders[tipo] = builder
+
+    # --- Estado en Redis ---
+
+    def _job_key(self, job_id: str) -> str:
+        return f"download:{job_id}"
+
+    def _heartbeat_key(self, job_id: str) -> str:
+        return f"download_heartbeat:{job_id}"
+
+    def _load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        data = self.redis.get(self._job_key(job_id))
+        return json.loads(data) if data else None
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._load_job(job_id)
+        if job and job.get("estado") in (PENDING, RUNNING) and not self.redis.exists(self._heartbeat_key(job_id)):
+            # El proceso que lo ejecutaba ya no renueva el latido
+            job.update(estado=ERROR, mensaje="Exportación interrumpida")
+        return job
+
+    def update_job(self, job_id: str, **fields) -> Dict[str, Any]:
+        job = self._load_job(job_id) or {"job_id": job_id}
+        job.update(fields)
+        self.redis.set(self._job_key(job_id), json.dumps(job), ex=self.cache_ttl * 2)
+        return job
+
+    def _cache_key(self, tipo: str, params: Dict[str, Any]) -> str:
+        normalized = json.dumps({"tipo": tipo, "params": params}, sort_keys=True, default=str)
+        return "export_cache:" + hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+    def artifact_path(self, job: Dict[str, Any]) -> Optional[str]:
+        path = job.get("path")
+        if job.get("estado") == COMPLETED and path and os.path.exists(path):
+            return path
+        return None
+
+    # --- Ciclo de vida ---
+
+    def submit(self, tipo: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if tipo not in self.builders:
+            raise ValueError(f"Tipo de exportación no soportado: {tipo}")
+
+        params = {key: value for key, value in params.items() if value is not None}
+        cache_key = self._cache_key(tipo, params)
+
+        cached_id = self.redis.get(cache_key)
+        if cached_id:
+            job = self.get_job(cached_id)
+            if job and (job.get("estado") in (PENDING, RUNNING) or self.artifact_path(job)):
+                return job
+
+        self.cleanup()
+        job_id = uuid.uuid4().hex
+        self._track(job_id)
+        job = self.update_job(
+            job_id,
+            tipo=tipo,
+            params=params,
+            estado=PENDING,
+            progreso=0,
+            created_at=time.time()
+        )
+        self.redis.set(cache_key, job_id, ex=self.cache_ttl)
+        self.executor.submit(self._run, job_id, tipo, params)
+        return job
+
+    def _run(self, job_id: str, tipo: str, params: Dict[str, Any]):
+        progress = ExportProgress(self, job_id)
+        path = os.path.join(self.export_dir, f"{job_id}.zip")
+        db = self.session_factory()
+        try:
+            self.update_job(job_id, estado=RUNNING, started_at=time.time())
+            filename, entries = self.builders[tipo](db, params, progress)
+
+            tmp_path = path + ".part"
+            with open(tmp_path, 'wb') as f:
+                for chunk in stream_zip(entries):
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+
+            progress.flush(force=True)
+            self.update_job(
+                job_id,
+                estado=COMPLETED,
+                progreso=100,
+                filename=filename,
+                path=path,
+                size=os.path.getsize(path),
+                finished_at=time.time()
+            )
+            print(f"Exportación {tipo} {job_id} completada: {progress.processed} registros")
+        except Exception as e:
+            print(f"Error en exportación {tipo} {job_id}: {str(e)}")
+            self.update_job(job_id, estado=ERROR, mensaje=str(e), finished_at=time.time())
+            for leftover in (path, path + ".part"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        finally:
+            db.close()
+            self._untrack(job_id)
+
+    # --- Latido ---
+
+    def _beat(self, job_id: str):
+        self.redis.set(self._heartbeat_key(job_id), 1, ex=EXPORT_STALE_AFTER)
+
+    def _track(self, job_id: str):
+        self._beat(job_id)
+        with self._inflight_lock:
+            self._inflight.add(job_id)
+            if self._heartbeat_thread is None:
+                self._heartbeat_thread = threading.Thread(
+                    target=self._heartbeat_loop, name="export-heartbeat", daemon=True
+                )
+                self._heartbeat_thread.start()
+
+    def _untrack(self, job_id: str):
+        with self._inflight_lock:
+            self._inflight.discard(job_id)
+        try:
+            self.redis.delete(self._heartbeat_key(job_id))
+        except Exception as e:
+            print(f"Error borrando latido de exportación {job_id}: {str(e)}")
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(EXPORT_HEARTBEAT_INTERVAL)
+            with self._inflight_lock:
+                job_ids = list(self._inflight)
+            for job_id in job_ids:
+                try:
+                    self._beat(job_id)
+                except Exception as e:
+                    print(f"Error renovando latido de exportación {job_id}: {str(e)}")
+
+    def cleanup(self):
+        """Elimina archivos generados que ya superaron el tiempo de cache."""
+        limit = time.time() - self.cache_ttl * 2
+        try:
+            for name in os.listdir(self.export_dir):
+                path = os.path.join(self.export_dir, name)
+                if name.endswith(".zip") and os.path.getmtime(path) < limit:
+                    os.remove(path)
+        except OSError as e:
+            print(f"Error limpiando exportaciones antiguas: {str(e)}")
@@ -0,0 +1,268 @@
+import io
+import os
+import csv
+import json
+import base64
+import zipfile
+import tempfile
+import itertools
+from datetime import date, datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+
+# Filas que se piden al cursor del servidor en cada viaje
+EXPORT_CHUNK_SIZE = 5000
+# Tamaño aproximado de cada bloque enviado al cliente
+STREAM_CHUNK_SIZE = 64 * 1024
+# Filas por archivo Excel dentro del ZIP (igual que los lotes de descarga)
+EXCEL_ROWS_PER_FILE = 100000
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """
+    Destino no posicionable para ZipFile.
+
+    ZipFile detecta que no puede hacer seek y escribe cada entrada con
+    "data descriptor", de modo que los bytes comprimidos se pueden ir
+    enviando al cliente a medida que se generan.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def model_columns(model) -> List[str]:
+    """Nombres de columnas de un modelo, en el mismo orden que usa to_dict."""
+    return [column.key for column in model.__table__.columns]
+
+
+def iter_query_rows(query, session_factory: Optional[Callable] = None, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator:
+    """
+    Recorre una consulta con un cursor del lado del servidor (yield_per),
+    manteniendo en memoria solo `chunk_size` filas a la vez.
+
+    Si se indica `session_factory`, la consulta se ejecuta en una sesión
+    propia que se cierra al terminar; necesario cuando el recorrido ocurre
+    dentro de un StreamingResponse, después de que la sesión de la
+    petición ya fue liberada.
+    """
+    if session_factory is None:
+        yield from query.yield_per(chunk_size)
+        return
+
+    session = session_factory()
+    try:
+        yield from query.with_session(session).yield_per(chunk_size)
+    finally:
+        session.close()
+
+
+def iter_keyset_rows(query, key_column, after=None, limit: Optional[int] = None,
+                     session_factory: Optional[Callable] = None, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator:
+    """
+    Recorre una consulta por páginas ordenadas por `key_column` usando
+    paginación por llave (WHERE key > último visto) en lugar de OFFSET.
+
+    Cada página cuesta lo mismo sin importar cuántas filas se saltaron
+    antes, y el orden es estable aunque se inserten filas durante la
+    descarga. `after` es el último valor ya entregado (exclusivo) y
+    `limit` el máximo de filas a devolver.
+    """
+    session = session_factory() if session_factory is not None else None
+    try:
+        base = query.with_session(session) if session is not None else query
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            page = base
+            if after is not None:
+                page = page.filter(key_column > after)
+            rows = page.order_by(key_column).limit(size).all()
+            if not rows:
+                break
+            yield from rows
+            after = getattr(rows[-1], key_column.key)
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < size:
+                break
+    finally:
+        if session is not None:
+            session.close()
+
+
+def keyset_boundaries(query, key_column, batch_size: int) -> List:
+    """
+    Devuelve el valor de llave desde el cual arranca cada lote de
+    `batch_size` filas (None para el primero), en una sola pasada sobre
+    el índice de la llave.
+    """
+    numbered = query.with_entities(
+        key_column.label('key'),
+        func.row_number().over(order_by=key_column).label('rn')
+    ).subquery()
+    ends = (
+        query.session.query(numbered.c.key)
+        .filter(numbered.c.rn % batch_size == 0)
+        .order_by(numbered.c.key)
+        .all()
+    )
+    return [None] + [row.key for row in ends]
+
+
+def encode_cursor(after) -> str:
+    """Token opaco para retomar una descarga por lotes después de `after`."""
+    payload = json.dumps({"after": after}).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(token: str):
+    """Inverso de encode_cursor; lanza ValueError si el token no es válido."""
+    try:
+        return json.loads(base64.urlsafe_b64decode(token.encode('ascii')))["after"]
+    except Exception as e:
+        raise ValueError(f"Cursor inválido: {token}") from e
+
+
+def iter_delimited(header: Sequence[str], rows: Iterable[Sequence], delimiter: str = '\t') -> Iterator[bytes]:
+    """Genera un archivo de texto delimitado (UTF-8) por bloques."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator='\n')
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= STREAM_CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _cell_length(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (date, datetime)):
+        return 10
+    return len(str(value))
+
+
+def iter_excel_workbook(sheets: Iterable[Tuple[str, Sequence[str], Sequence[str], Iterable[Sequence]]]) -> Iterator[bytes]:
+    """
+    Escribe un xlsx en modo constant_memory sobre un archivo temporal y lo
+    devuelve por bloques. xlsxwriter vuelca cada fila a disco al pasar a
+    la siguiente, así que la memoria no crece con el número de filas.
+
+    `sheets` es una secuencia de (nombre, líneas de título, encabezado, filas);
+    las hojas se escriben una tras otra, en orden.
+    """
+    import xlsxwriter
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd',
+            'remove_timezone': True
+        })
+        header_format = workbook.add_format({'bold': True, 'border': 1})
+        title_format = workbook.add_format({'bold': True, 'bg_color': '#D3D3D3', 'border': 1})
+
+        for sheet_name, titles, header, rows in sheets:
+            worksheet = workbook.add_worksheet(sheet_name[:31])
+            for row_idx, title in enumerate(titles):
+                worksheet.write(row_idx, 0, title, title_format)
+            # Una fila en blanco entre los títulos y los datos
+            header_row = len(titles) + 1 if titles else 0
+
+            widths = [len(str(col)) for col in header]
+            worksheet.write_row(header_row, 0, header, header_format)
+            for row_idx, row in enumerate(rows, start=header_row + 1):
+                worksheet.write_row(row_idx, 0, row)
+                for col_idx, value in enumerate(row):
+                    length = _cell_length(value)
+                    if length > widths[col_idx]:
+                        widths[col_idx] = length
+
+            for col_idx, width in enumerate(widths):
+                worksheet.set_column(col_idx, col_idx, width + 2)
+        workbook.close()
+
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+def iter_excel_file(header: Sequence[str], rows: Iterable[Sequence], sheet_name: str = 'Electores') -> Iterator[bytes]:
+    """Un xlsx de una sola hoja; ver iter_excel_workbook."""
+    return iter_excel_workbook([(sheet_name, [], header, rows)])
+
+
+def excel_parts(header: Sequence[str], rows: Iterable[Sequence], names: Sequence[str],
+                sheet_name: str = 'Electores', rows_per_file: int = EXCEL_ROWS_PER_FILE) -> Iterator[Tuple[str, Iterator[bytes]]]:
+    """Reparte las filas en varios xlsx de `rows_per_file` filas, uno por nombre."""
+    rows = iter(rows)
+    for name in names:
+        yield name, iter_excel_file(header, itertools.islice(rows, rows_per_file), sheet_name)
+
+
+def stream_zip(entries: Iterable[Tuple[str, Iterable[bytes]]], compresslevel: int = 6) -> Iterator[bytes]:
+    """
+    Comprime al vuelo una secuencia de entradas (nombre, bloques de bytes)
+    y va entregando el ZIP resultante por bloques, sin armarlo en memoria.
+    """
+    sink = _ZipStreamBuffer()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zip_file:
+        for arcname, chunks in entries:
+            with zip_file.open(arcname, 'w', force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    if sink.pending() >= STREAM_CHUNK_SIZE:
+                        yield sink.drain()
+            if sink.pending():
+                yield sink.drain()
+    if sink.pending():
+        yield sink.drain()
+
+
+# Versiones que devuelven el archivo completo en bytes, para armarlo en el
+# pool de procesos (run_cpu) y responder con el resultado. Reciben listas
+# simples para poder serializarse con pickle.
+
+def excel_bytes(sheets: Sequence[Tuple[str, Sequence[str], Sequence[str], Sequence[Sequence]]]) -> bytes:
+    return b"".join(iter_excel_workbook(sheets))
+
+
+def excel_zip_bytes(sheets: Sequence[Tuple[str, Sequence[str], Sequence[str], Sequence[Sequence]]],
+                    filename: str, compresslevel: int = 9) -> bytes:
+    return b"".join(stream_zip([(filename, iter_excel_workbook(sheets))], compresslevel))
@@ -0,0 +1,231 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+# Códigos que indican que la instancia está saturada o no disponible momentáneamente
+RETRY_STATUS = {429, 502, 503, 504}
+# Para envíos solo los que garantizan que GreenAPI no procesó la petición: un
+# 502/504 del gateway puede llegar cuando el mensaje ya se entregó
+SEND_RETRY_STATUS = {429, 503}
+
+
+class GreenAPIError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None, response_text: str = ""):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response_text = response_text
+
+
+def normalize_chat_id(chat_id) -> str:
+    """Agrega el sufijo @c.us si el chat_id es solo un número (compatibilidad iOS/Android)."""
+    chat_id = str(chat_id)
+    if "@c.us" not in chat_id and "@g.us" not in chat_id:
+        chat_id = f"{chat_id}@c.us"
+    return chat_id
+
+
+class GreenAPIClient:
+    """
+    Cliente HTTP para la API de GreenAPI con conexiones persistentes.
+
+    Expone cada operación en versión async (para los endpoints de FastAPI,
+    sobre un httpx.AsyncClient compartido) y en versión *_sync (para los
+    bots, que corren en procesos sin event loop, sobre un httpx.Client).
+    Ambas comparten tiempos de espera, reintentos con backoff exponencial y
+    un límite de peticiones simultáneas hacia GreenAPI.
+    """
+
+    def __init__(self, api_url_base: str, api_token: str, timeout: float = 15.0,
+                 connect_timeout: float = 5.0, retries: int = 3, backoff: float = 0.5,
+                 max_concurrency: int = 20, max_connections: int = 50):
+        self.api_url_base = api_url_base.rstrip("/")
+        self.api_token = api_token
+        self.retries = retries
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_concurrency)
+
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_semaphore: Optional[asyncio.Semaphore] = None
+        self._sync_client: Optional[httpx.Client] = None
+        self._sync_semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._sync_lock = threading.Lock()
+
+    def _url(self, method: str) -> str:
+        return f"{self.api_url_base}/{method}/{self.api_token}"
+
+    def _delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+
+    def _should_retry(self, attempt: int, error: Optional[Exception], status_code: Optional[int], idempotent: bool) -> bool:
+        if attempt >= self.retries:
+            return False
+        if status_code is not None:
+            if not idempotent:
+                return status_code in SEND_RETRY_STATUS
+            return status_code in RETRY_STATUS or status_code >= 500
+        # Sin respuesta: un envío solo se reintenta si la petición no llegó a salir,
+        # para no duplicar mensajes
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            return True
+        return idempotent and isinstance(error, httpx.TransportError)
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> Any:
+        if response.status_code >= 400:
+            raise GreenAPIError(
+                f"GreenAPI respondió {response.status_code}",
+                status_code=response.status_code,
+                response_text=response.text
+            )
+        return response.json()
+
+    # --- Transporte ---
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._async_client
+
+    def _get_sync_client(self) -> httpx.Client:
+        with self._sync_lock:
+            if self._sync_client is None or self._sync_client.is_closed:
+                self._sync_client = httpx.Client(timeout=self.timeout, limits=self.limits)
+            return self._sync_client
+
+    async def request(self, http_method: str, method: str, idempotent: bool = False, **kwargs) -> Any:
+        client = self._get_async_client()
+        attempt = 0
+        while True:
+            error = None
+            status_code = None
+            try:
+                async with self._async_semaphore:
+                    response = await client.request(http_method, self._url(method), **kwargs)
+                status_code = response.status_code
+                if not self._should_retry(attempt, None, status_code, idempotent):
+                    return self._parse(response)
+            except httpx.TransportError as e:
+                error = e
+                if not self._should_retry(attempt, e, None, idempotent):
+                    raise GreenAPIError(f"No se pudo conectar con GreenAPI: {e}") from e
+            print(f"GreenAPI {method}: reintento {attempt + 1} ({status_code or error})")
+            await asyncio.sleep(self._delay(attempt))
+            attempt += 1
+
+    def request_sync(self, http_method: str, method: str, idempotent: bool = False, **kwargs) -> Any:
+        client = self._get_sync_client()
+        attempt = 0
+        while True:
+            error = None
+            status_code = None
+            try:
+                with self._sync_semaphore:
+                    response = client.request(http_method, self._url(method), **kwargs)
+                status_code = response.status_code
+                if not self._should_retry(attempt, None, status_code, idempotent):
+                    return self._parse(response)
+            except httpx.TransportError as e:
+                error = e
+                if not self._should_retry(attempt, e, None, idempotent):
+                    raise GreenAPIError(f"No se pudo conectar con GreenAPI: {e}") from e
+            print(f"GreenAPI {method}: reintento {attempt + 1} ({status_code or error})")
+            time.sleep(self._delay(attempt))
+            attempt += 1
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    # --- Operaciones ---
+    # Cada operación se describe una vez como (verbo, método, argumentos) y se
+    # ejecuta con el transporte async o sync.
+
+    @staticmethod
+    def _check_whatsapp_call(phone_number: str) -> Tuple[str, str, Dict[str, Any]]:
+        phone_number = ''.join(filter(str.isdigit, str(phone_number)))
+        return "POST", "checkWhatsapp", {"json": {"phoneNumber": int(phone_number)}, "idempotent": True}
+
+    @staticmethod
+    def _send_message_call(chat_id, message: str):
+        return "POST", "sendMessage", {"json": {"chatId": normalize_chat_id(chat_id), "message": message}}
+
+    @staticmethod
+    def _send_file_by_upload_call(chat_id, content: bytes, filename: str, mime_type: str):
+        return "POST", "sendFileByUpload", {
+            "data": {"chatId": normalize_chat_id(chat_id)},
+            "files": {"file": (filename, content, mime_type)}
+        }
+
+    @staticmethod
+    def _send_file_by_base64_call(chat_id, base64_data: str, filename: str, caption: str):
+        return "POST", "sendFileByBase64", {"json": {
+            "chatId": normalize_chat_id(chat_id),
+            "body": base64_data,
+            "filename": filename,
+            "caption": caption
+        }}
+
+    @staticmethod
+    def _send_contact_call(chat_id, phone_contact, first_name: str, last_name: str, company: str):
+        return "POST", "sendContact", {"json": {
+            "chatId": normalize_chat_id(chat_id),
+            "contact": {
+                "phoneContact": phone_contact,
+                "firstName": first_name,
+                "lastName": last_name,
+                "company": company
+            }
+        }}
+
+    @staticmethod
+    def _get_settings_call():
+        return "GET", "getSettings", {"idempotent": True}
+
+    async def _call(self, call) -> Any:
+        http_method, method, kwargs = call
+        return await self.request(http_method, method, **kwargs)
+
+    def _call_sync(self, call) -> Any:
+        http_method, method, kwargs = call
+        return self.request_sync(http_method, method, **kwargs)
+
+    async def check_whatsapp(self, phone_number: str) -> Any:
+        return await self._call(self._check_whatsapp_call(phone_number))
+
+    async def send_message(self, chat_id, message: str) -> Any:
+        return await self._call(self._send_message_call(chat_id, message))
+
+    async def send_file_by_upload(self, chat_id, content: bytes, filename: str = "qrcode.png", mime_type: str = "image/png") -> Any:
+        return await self._call(self._send_file_by_upload_call(chat_id, content, filename, mime_type))
+
+    async def send_file_by_base64(self, chat_id, base64_data: str, filename: str = "image.png", caption: str = "") -> Any:
+        return await self._call(self._send_file_by_base64_call(chat_id, base64_data, filename, caption))
+
+    async def send_contact(self, chat_id, phone_contact, first_name: str, last_name: str, company: str) -> Any:
+        return await self._call(self._send_contact_call(chat_id, phone_contact, first_name, last_name, company))
+
+    async def get_settings(self) -> Any:
+        return await self._call(self._get_settings_call())
+
+    def check_whatsapp_sync(self, phone_number: str) -> Any:
+        return self._call_sync(self._check_whatsapp_call(phone_number))
+
+    def send_message_sync(self, chat_id, message: str) -> Any:
+        return self._call_sync(self._send_message_call(chat_id, message))
+
+    def send_file_by_upload_sync(self, chat_id, content: bytes, filename: str = "qrcode.png", mime_type: str = "image/png") -> Any:
+        return self._call_sync(self._send_file_by_upload_call(chat_id, content, filename, mime_type))
+
+    def send_contact_sync(self, chat_id, phone_contact, first_name: str, last_name: str, company: str) -> Any:
+        return self._call_sync(self._send_contact_call(chat_id, phone_contact, first_name, last_name, company))
+
+    def get_settings_sync(self) -> Any:
+        return self._call_sync(self._get_settings_call())
@@ -0,0 +1,117 @@
+import json
+import time
+import uuid
+import base64
+from typing import Any, Dict, Optional
+
+from redis import Redis as SyncRedis
+
+# Cola principal (RPUSH para encolar, el worker consume por la izquierda)
+OUTBOX_KEY = "whatsapp:outbox"
+# Reintentos programados: sorted set con la hora en que vuelven a la cola
+RETRY_KEY = "whatsapp:outbox:retry"
+# Mensajes que agotaron los reintentos o que GreenAPI rechazó
+DEAD_KEY = "whatsapp:outbox:dead"
+# Contadores de entrega (hash)
+METRICS_KEY = "whatsapp:outbox:metrics"
+# Mensajes en curso de cada worker, para recuperarlos si el proceso muere
+PROCESSING_PREFIX = "whatsapp:outbox:processing:"
+# Latido de cada worker (con TTL); sin él, su lista de en curso se recupera
+WORKER_PREFIX = "whatsapp:outbox:worker:"
+
+# Tipos de mensaje
+TEXT = "text"
+FILE = "file"
+CONTACT = "contact"
+
+
+def build_message(kind: str, chat_id, **payload) -> str:
+    return json.dumps({
+        "id": uuid.uuid4().hex,
+        "kind": kind,
+        "chat_id": str(chat_id),
+        "payload": payload,
+        "attempts": 0,
+        "enqueued_at": time.time()
+    })
+
+
+def text_message(chat_id, message: str) -> str:
+    return build_message(TEXT, chat_id, message=message)
+
+
+def file_message(chat_id, content: bytes, filename: str = "qrcode.png", mime_type: str = "image/png") -> str:
+    return build_message(
+        FILE, chat_id,
+        content=base64.b64encode(content).decode(),
+        filename=filename,
+        mime_type=mime_type
+    )
+
+
+def contact_message(chat_id, phone_contact, first_name: str, last_name: str, company: str) -> str:
+    return build_message(
+        CONTACT, chat_id,
+        phone_contact=phone_contact,
+        first_name=first_name,
+        last_name=last_name,
+        company=company
+    )
+
+
+class OutboundQueue:
+    """
+    Productor de la cola de salida para código síncrono (bots).
+
+    En los endpoints async se encola directamente con el cliente
+    redis.asyncio: `await redis.rpush(OUTBOX_KEY, text_message(...))`.
+    """
+
+    def __init__(self, redis_client: SyncRedis):
+        self.redis = redis_client
+
+    @classmethod
+    def from_url(cls, redis_url: str) -> "OutboundQueue":
+        return cls(SyncRedis.from_url(redis_url, decode_responses=True))
+
+    def _push(self, message: str) -> str:
+        self.redis.rpush(OUTBOX_KEY, message)
+        return json.loads(message)["id"]
+
+    def send_text(self, chat_id, message: str) -> str:
+        return self._push(text_message(chat_id, message))
+
+    def send_file(self, chat_id, content: bytes, filename: str = "qrcode.png", mime_type: str = "image/png") -> str:
+        return self._push(file_message(chat_id, content, filename, mime_type))
+
+    def send_contact(self, chat_id, phone_contact, first_name: str, last_name: str, company: str) -> str:
+        return self._push(contact_message(chat_id, phone_contact, first_name, last_name, company))
+
+
+async def queue_stats(redis_client) -> Dict[str, Any]:
+    """Tamaño de la cola, reintentos pendientes, mensajes muertos y contadores de entrega."""
+    pipe = redis_client.pipeline()
+    pipe.llen(OUTBOX_KEY)
+    pipe.zcard(RETRY_KEY)
+    pipe.llen(DEAD_KEY)
+    pipe.hgetall(METRICS_KEY)
+    pendientes, reintentos, muertos, metrics = await pipe.execute()
+
+    enviados = int(metrics.get("enviados", 0))
+    latencia_total = float(metrics.get("latencia_total_ms", 0))
+    return {
+        "pendientes": pendientes,
+        "reintentos_programados": reintentos,
+        "muertos": muertos,
+        "enviados": enviados,
+        "reintentos": int(metrics.get("reintentos", 0)),
+        "descartados": int(metrics.get("descartados", 0)),
+        "latencia_promedio_ms": round(latencia_total / enviados, 1) if enviados else None
+    }
+
+
+def parse_message(raw: str) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
@@ -0,0 +1,15 @@
+# Envoltorios de werkzeug.security importados al primer uso: werkzeug
+# (servidor, test client, wrappers) no se carga al importar app.main.
+# Son funciones de módulo para poder ejecutarse con run_cpu.
+
+
+def hash_password(password: str) -> str:
+    from werkzeug.security import generate_password_hash
+
+    return generate_password_hash(password)
+
+
+def check_password(hashed_password: str, password: str) -> bool:
+    from werkzeug.security import check_password_hash
+
+    return check_password_hash(hashed_password, password)
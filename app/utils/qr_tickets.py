@@ -0,0 +1,84 @@
+import hmac
+import zlib
+import struct
+import hashlib
+from typing import List, Optional
+
+# Versión del formato del contenido del QR: LB1.<numero_ticket>.<firma>
+PAYLOAD_PREFIX = "LB1"
+SIGNATURE_LENGTH = 16
+DEFAULT_BOX_SIZE = 8
+DEFAULT_BORDER = 4
+
+
+def _signature(ticket_number: str, secret: str) -> str:
+    digest = hmac.new(secret.encode(), ticket_number.encode(), hashlib.sha256).hexdigest()
+    return digest[:SIGNATURE_LENGTH]
+
+
+def qr_payload(ticket_number: str, secret: str) -> str:
+    """
+    Contenido compacto del QR: solo el número de ticket y una firma HMAC.
+    Los datos del participante se consultan con el número, no viajan en la imagen.
+    """
+    return f"{PAYLOAD_PREFIX}.{ticket_number}.{_signature(ticket_number, secret)}"
+
+
+def verify_qr_payload(payload: str, secret: str) -> Optional[str]:
+    """Devuelve el número de ticket si la firma es válida, None en caso contrario."""
+    parts = payload.strip().split(".")
+    if len(parts) != 3 or parts[0] != PAYLOAD_PREFIX:
+        return None
+    ticket_number, signature = parts[1], parts[2]
+    if not hmac.compare_digest(signature, _signature(ticket_number, secret)):
+        return None
+    return ticket_number
+
+
+def qr_matrix(data: str) -> List[List[bool]]:
+    """Módulos del QR (True = oscuro), incluyendo el borde."""
+    import qrcode
+
+    qr = qrcode.QRCode(
+        version=None,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        box_size=1,
+        border=DEFAULT_BORDER,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def matrix_to_png(matrix: List[List[bool]], box_size: int = DEFAULT_BOX_SIZE) -> bytes:
+    """
+    Codifica la matriz como PNG en escala de grises de 1 bit.
+
+    Evita PIL: cada fila de módulos se empaqueta una sola vez y se repite
+    box_size veces, así el costo depende del número de módulos y no de
+    los píxeles de la imagen.
+    """
+    size = len(matrix) * box_size
+    padding = (-size) % 8
+    raw = bytearray()
+    for row in matrix:
+        bits = "".join(("0" if dark else "1") * box_size for dark in row) + "1" * padding
+        packed = b"\x00" + int(bits, 2).to_bytes(len(bits) // 8, "big")
+        raw += packed * box_size
+
+    header = struct.pack(">IIBBBBB", size, size, 1, 0, 0, 0, 0)
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        _png_chunk(b"IHDR", header),
+        _png_chunk(b"IDAT", zlib.compress(bytes(raw), 9)),
+        _png_chunk(b"IEND", b""),
+    ])
+
+
+def render_ticket_qr(ticket_number: str, secret: str, box_size: int = DEFAULT_BOX_SIZE) -> bytes:
+    """PNG del QR de un ticket."""
+    return matrix_to_png(qr_matrix(qr_payload(ticket_number, secret)), box_size)
@@ -0,0 +1,169 @@
+import time
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Geografico, CentroVotacion
+
+
+def _as_int(value) -> Optional[int]:
+    """Convierte un código recibido como str/int a int; None si no es válido."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _row_to_dict(obj) -> Dict[str, Any]:
+    return {c.key: getattr(obj, c.key) for c in obj.__table__.columns}
+
+
+class ReferenceData:
+    """
+    Índice en memoria de las tablas geograficos y centros_votacion.
+
+    Son tablas pequeñas y prácticamente estáticas; se indexan por código
+    para que la resolución de nombres sea una consulta a diccionario en
+    lugar de un viaje a Postgres.
+    """
+
+    def __init__(self, geograficos: List[Dict[str, Any]], centros: List[Dict[str, Any]], version: Optional[int] = None):
+        self.version = version
+        self.loaded_at = time.time()
+
+        self._estados: Dict[int, str] = {}
+        self._municipios: Dict[Tuple[int, int], str] = {}
+        self._geograficos: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+        self._centros: Dict[int, Dict[str, Any]] = {}
+        self._centros_por_ubicacion: Dict[Tuple[int, int, int], List[Dict[str, Any]]] = {}
+
+        for geo in sorted(geograficos, key=lambda g: g["id"]):
+            estado_key = geo["codigo_estado"]
+            municipio_key = (geo["codigo_estado"], geo["codigo_municipio"])
+            parroquia_key = (geo["codigo_estado"], geo["codigo_municipio"], geo["codigo_parroquia"])
+            self._estados.setdefault(estado_key, geo["estado"])
+            self._municipios.setdefault(municipio_key, geo["municipio"])
+            self._geograficos.setdefault(parroquia_key, geo)
+
+        for centro in sorted(centros, key=lambda c: c["id"]):
+            self._centros.setdefault(centro["codificacion_nueva_cv"], centro)
+            ubicacion = (centro["codigo_estado"], centro["codigo_municipio"], centro["codigo_parroquia"])
+            self._centros_por_ubicacion.setdefault(ubicacion, []).append(centro)
+
+    @classmethod
+    def load(cls, db: Session, version: Optional[int] = None) -> "ReferenceData":
+        geograficos = [_row_to_dict(g) for g in db.query(Geografico).all()]
+        centros = [_row_to_dict(c) for c in db.query(CentroVotacion).all()]
+        return cls(geograficos, centros, version=version)
+
+    # --- Resolución de nombres por código ---
+
+    def estado_nombre(self, codigo_estado) -> Optional[str]:
+        return self._estados.get(_as_int(codigo_estado))
+
+    def municipio_nombre(self, codigo_estado, codigo_municipio) -> Optional[str]:
+        return self._municipios.get((_as_int(codigo_estado), _as_int(codigo_municipio)))
+
+    def parroquia_nombre(self, codigo_estado, codigo_municipio, codigo_parroquia) -> Optional[str]:
+        geo = self.geografico(codigo_estado, codigo_municipio, codigo_parroquia)
+        return geo["parroquia"] if geo else None
+
+    def geografico(self, codigo_estado, codigo_municipio, codigo_parroquia) -> Optional[Dict[str, Any]]:
+        return self._geograficos.get(
+            (_as_int(codigo_estado), _as_int(codigo_municipio), _as_int(codigo_parroquia))
+        )
+
+    def centro(self, codigo_centro) -> Optional[Dict[str, Any]]:
+        return self._centros.get(_as_int(codigo_centro))
+
+    def centro_nombre(self, codigo_centro) -> Optional[str]:
+        centro = self.centro(codigo_centro)
+        return centro["nombre_cv"] if centro else None
+
+    # --- Listados para los selectores del frontend ---
+
+    def estados(self) -> List[Tuple[int, str]]:
+        return sorted(self._estados.items(), key=lambda item: item[1] or "")
+
+    def municipios(self, codigo_estado) -> List[Tuple[int, str]]:
+        codigo_estado = _as_int(codigo_estado)
+        return sorted(
+            ((m, nombre) for (e, m), nombre in self._municipios.items() if e == codigo_estado),
+            key=lambda item: item[1] or ""
+        )
+
+    def parroquias(self, codigo_estado, codigo_municipio) -> List[Tuple[int, str]]:
+        codigo_estado = _as_int(codigo_estado)
+        codigo_municipio = _as_int(codigo_municipio)
+        return sorted(
+            (
+                (p, geo["parroquia"])
+                for (e, m, p), geo in self._geograficos.items()
+                if e == codigo_estado and m == codigo_municipio
+            ),
+            key=lambda item: item[1] or ""
+        )
+
+    def centros_por_ubicacion(self, codigo_estado, codigo_municipio, codigo_parroquia) -> List[Dict[str, Any]]:
+        ubicacion = (_as_int(codigo_estado), _as_int(codigo_municipio), _as_int(codigo_parroquia))
+        return list(self._centros_por_ubicacion.get(ubicacion, []))
+
+    def centros_por_estado(self, codigo_estado) -> List[Dict[str, Any]]:
+        codigo_estado = _as_int(codigo_estado)
+        return [c for c in self._centros.values() if c["codigo_estado"] == codigo_estado]
+
+
+class ReferenceDataCache:
+    """
+    Cache de lectura a través (read-through) para ReferenceData.
+
+    Cada proceso mantiene su propia copia. La invalidación es por versión:
+    quien modifica las tablas incrementa una versión compartida (en Redis),
+    y cada proceso compara su versión como máximo cada `check_interval`
+    segundos, recargando el índice si quedó desactualizado.
+    """
+
+    def __init__(self, check_interval: float = 5.0):
+        self.check_interval = check_interval
+        self._data: Optional[ReferenceData] = None
+        self._remote_version: Optional[int] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def needs_version_check(self) -> bool:
+        return time.monotonic() - self._last_check >= self.check_interval
+
+    def sync_version(self, remote_version: Optional[int]):
+        """Registra la versión compartida; si cambió, el índice local se descarta."""
+        self._last_check = time.monotonic()
+        if remote_version is None:
+            return
+        self._remote_version = remote_version
+        if self._data is not None and self._data.version != remote_version:
+            self._data = None
+
+    def invalidate(self, remote_version: Optional[int] = None):
+        with self._lock:
+            self._data = None
+            if remote_version is not None:
+                self._remote_version = remote_version
+
+    def cached(self) -> Optional[ReferenceData]:
+        """El índice local si está vigente, sin tocar la base."""
+        return self._data
+
+    def get(self, db: Session) -> ReferenceData:
+        data = self._data
+        if data is not None:
+            return data
+        with self._lock:
+            if self._data is None:
+                self._data = ReferenceData.load(db, version=self._remote_version)
+                print(
+                    f"Datos de referencia cargados (versión {self._remote_version}): "
+                    f"{len(self._data._geograficos)} parroquias, {len(self._data._centros)} centros"
+                )
+            return self._data
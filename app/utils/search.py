@@ -0,0 +1,36 @@
+from typing import Sequence
+
+from sqlalchemy import or_, func
+
+# Cada columna buscable tiene un índice GIN con gin_trgm_ops (migración
+# add_trigram_search_indexes). Postgres resuelve el OR de varios ILIKE
+# '%texto%' combinando esos índices (BitmapOr) en lugar de recorrer la tabla.
+TRIGRAM_MIN_LENGTH = 3
+
+
+def like_pattern(term: str) -> str:
+    """'%term%' con los comodines del usuario escapados."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_filter(columns: Sequence, term: str):
+    pattern = like_pattern(term.strip())
+    return or_(*[column.ilike(pattern, escape="\\") for column in columns])
+
+
+def search_rank(columns: Sequence, term: str):
+    """Mejor word_similarity entre el texto buscado y las columnas (1 = coincidencia de palabra completa)."""
+    term = term.strip()
+    return func.greatest(*[func.word_similarity(term, func.coalesce(column, "")) for column in columns])
+
+
+def apply_search(query, columns: Sequence, term: str, ranked: bool = True):
+    """
+    Filtra la consulta por el texto buscado y, si ranked, ordena por relevancia.
+    Los términos de menos de 3 caracteres no forman trigramas y no se ordenan.
+    """
+    query = query.filter(search_filter(columns, term))
+    if ranked and len(term.strip()) >= TRIGRAM_MIN_LENGTH:
+        query = query.order_by(search_rank(columns, term).desc())
+    return query
@@ -0,0 +1,221 @@
+import sys
+import hmac
+import zlib
+import hashlib
+import secrets
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import Session
+
+from app.models import Ticket, Sorteo
+
+SNAPSHOT_FETCH_SIZE = 50000
+
+
+class NotEnoughTickets(Exception):
+    def __init__(self, disponibles: int, solicitados: int):
+        super().__init__(f"Solo hay {disponibles} tickets elegibles de {solicitados} solicitados")
+        self.disponibles = disponibles
+        self.solicitados = solicitados
+
+
+def eligible_filters(estado: Optional[str] = None, municipio: Optional[str] = None) -> list:
+    filters = [Ticket.validado.is_(True), Ticket.ganador.is_(False)]
+    if estado:
+        filters.append(Ticket.estado == estado)
+    if municipio:
+        filters.append(Ticket.municipio == municipio)
+    return filters
+
+
+def draw_winners(db: Session, cantidad: int, estado: Optional[str] = None,
+                 municipio: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Elige y marca los ganadores en una sola sentencia dentro de Postgres.
+
+    Se ordena al azar solo la proyección de ids (top-N en memoria del
+    servidor, proporcional a `cantidad`), se bloquean esas filas y un único
+    UPDATE ... RETURNING las marca. Si no alcanzan los tickets elegibles se
+    revierte todo y no queda ningún ganador a medias.
+    """
+    elegidos = (
+        select(Ticket.id)
+        .where(*eligible_filters(estado, municipio))
+        .order_by(func.random())
+        .limit(cantidad)
+        .with_for_update(skip_locked=True)
+        .cte("elegidos")
+    )
+    stmt = (
+        update(Ticket)
+        .where(Ticket.id.in_(select(elegidos.c.id)))
+        .values(ganador=True, updated_at=func.now())
+        .returning(*Ticket.__table__.columns)
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        ganadores = [dict(row._mapping) for row in db.execute(stmt)]
+        if len(ganadores) < cantidad:
+            raise NotEnoughTickets(len(ganadores), cantidad)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return ganadores
+
+
+def clear_winners(db: Session) -> int:
+    """Quita la marca de ganador a todos los tickets con un solo UPDATE."""
+    stmt = (
+        update(Ticket)
+        .where(Ticket.ganador.is_(True))
+        .values(ganador=False, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        result = db.execute(stmt)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result.rowcount
+
+
+# --- Sorteo auditable ---
+# Los ids elegibles se congelan en un arreglo ordenado de uint32; la semilla
+# y el hash del arreglo quedan guardados, así cualquiera puede repetir el
+# muestreo y comprobar los ganadores sin volver a leer la tabla de tickets.
+
+def snapshot_eligible_ids(db: Session, estado: Optional[str] = None,
+                          municipio: Optional[str] = None) -> array:
+    stmt = (
+        select(Ticket.id)
+        .where(*eligible_filters(estado, municipio))
+        .order_by(Ticket.id)
+        .execution_options(yield_per=SNAPSHOT_FETCH_SIZE)
+    )
+    ids = array('I')
+    for ticket_id in db.execute(stmt).scalars():
+        ids.append(ticket_id)
+    return ids
+
+
+def _little_endian(ids: array) -> bytes:
+    data = array('I', ids)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+def snapshot_hash(ids: array) -> str:
+    """SHA-256 de los ids como uint32 little-endian consecutivos."""
+    return hashlib.sha256(_little_endian(ids)).hexdigest()
+
+
+def pack_snapshot(ids: array) -> bytes:
+    # Ids ordenados: las diferencias son pequeñas y comprimen muy bien
+    deltas = array('I', (ids[i] - ids[i - 1] if i else ids[0] for i in range(len(ids))))
+    return zlib.compress(_little_endian(deltas), 9)
+
+
+def unpack_snapshot(packed: bytes) -> array:
+    deltas = array('I')
+    deltas.frombytes(zlib.decompress(packed))
+    if sys.byteorder == 'big':
+        deltas.byteswap()
+    ids = array('I')
+    total = 0
+    for delta in deltas:
+        total += delta
+        ids.append(total)
+    return ids
+
+
+def seeded_sample(seed: str, n: int, k: int) -> List[int]:
+    """
+    k posiciones distintas en [0, n), derivadas solo de la semilla.
+
+    Cada candidato es HMAC-SHA256(semilla, contador) reducido sin sesgo
+    (muestreo por rechazo), de modo que el resultado no depende de la
+    versión de Python ni del generador de `random`. Costo O(k) esperado
+    cuando k es pequeño frente a n.
+    """
+    if k > n:
+        raise NotEnoughTickets(n, k)
+    if k <= 0:
+        return []
+    limit = 2 ** 64 - (2 ** 64 % n)
+    key = seed.encode()
+    chosen: List[int] = []
+    seen = set()
+    counter = 0
+    while len(chosen) < k:
+        digest = hmac.new(key, counter.to_bytes(8, 'big'), hashlib.sha256).digest()
+        counter += 1
+        value = int.from_bytes(digest[:8], 'big')
+        if value >= limit:
+            continue
+        position = value % n
+        if position not in seen:
+            seen.add(position)
+            chosen.append(position)
+    return chosen
+
+
+def draw_audited(db: Session, cantidad: int, estado: Optional[str] = None,
+                 municipio: Optional[str] = None) -> Tuple[Sorteo, List[Dict[str, Any]]]:
+    """
+    Sorteo reproducible: congela los elegibles, muestrea con la semilla y marca a los ganadores.
+
+    La semilla se genera aquí, después de congelar la lista; quien pide el
+    sorteo no puede elegirla ni probar varias hasta obtener un resultado.
+    """
+    try:
+        ids = snapshot_eligible_ids(db, estado, municipio)
+        semilla = secrets.token_hex(16)
+        ganadores_ids = [ids[position] for position in seeded_sample(semilla, len(ids), cantidad)]
+
+        stmt = (
+            update(Ticket)
+            .where(Ticket.id.in_(ganadores_ids), *eligible_filters())
+            .values(ganador=True, updated_at=func.now())
+            .returning(*Ticket.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        ganadores = {row.id: dict(row._mapping) for row in db.execute(stmt)}
+        if len(ganadores) < cantidad:
+            # Algún ticket dejó de ser elegible después de congelar la lista
+            raise NotEnoughTickets(len(ganadores), cantidad)
+
+        sorteo = Sorteo(
+            semilla=semilla,
+            estado=estado,
+            municipio=municipio,
+            cantidad=cantidad,
+            total_elegibles=len(ids),
+            snapshot=pack_snapshot(ids),
+            snapshot_hash=snapshot_hash(ids),
+            ganadores=ganadores_ids
+        )
+        db.add(sorteo)
+        db.commit()
+        db.refresh(sorteo)
+    except Exception:
+        db.rollback()
+        raise
+    return sorteo, [ganadores[ticket_id] for ticket_id in ganadores_ids]
+
+
+def verify_draw(sorteo: Sorteo) -> Dict[str, Any]:
+    """Recalcula hash y ganadores a partir de lo guardado en el sorteo."""
+    ids = unpack_snapshot(sorteo.snapshot)
+    hash_ok = snapshot_hash(ids) == sorteo.snapshot_hash and len(ids) == sorteo.total_elegibles
+    esperados = [ids[position] for position in seeded_sample(sorteo.semilla, len(ids), sorteo.cantidad)]
+    return {
+        "sorteo_id": sorteo.id,
+        "snapshot_valido": hash_ok,
+        "ganadores_validos": esperados == list(sorteo.ganadores),
+        "ganadores_esperados": esperados
+    }
@@ -0,0 +1,49 @@
+from typing import Dict, Iterable, Optional
+
+from app.utils.phone_utils import normalize_phone_number
+
+CACHE_PREFIX = "whatsapp:exists:"
+# Un número con WhatsApp rara vez deja de tenerlo; uno sin WhatsApp puede
+# activarlo en cualquier momento (p. ej. justo antes de registrarse)
+POSITIVE_TTL_SECONDS = 7 * 24 * 3600
+NEGATIVE_TTL_SECONDS = 10 * 60
+
+
+def phone_cache_key(phone_number: str) -> str:
+    return f"{CACHE_PREFIX}{normalize_phone_number(phone_number)}"
+
+
+def greenapi_phone(phone_number: str) -> str:
+    """Número normalizado, solo dígitos, como lo espera checkWhatsapp."""
+    return normalize_phone_number(phone_number).lstrip("+")
+
+
+class WhatsAppCheckCache:
+    """
+    Cache en Redis de los resultados de checkWhatsapp, por número normalizado.
+
+    Solo se guardan respuestas reales de GreenAPI; los errores de conexión
+    no se cachean para no marcar como inválido un número por una caída.
+    """
+
+    def __init__(self, redis_client, positive_ttl: int = POSITIVE_TTL_SECONDS,
+                 negative_ttl: int = NEGATIVE_TTL_SECONDS):
+        self.redis = redis_client
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+
+    async def get(self, phone_number: str) -> Optional[bool]:
+        value = await self.redis.get(phone_cache_key(phone_number))
+        return None if value is None else value == "1"
+
+    async def get_many(self, phone_numbers: Iterable[str]) -> Dict[str, Optional[bool]]:
+        """Resultado cacheado por número normalizado (None si no está en cache)."""
+        normalized = list(dict.fromkeys(normalize_phone_number(p) for p in phone_numbers))
+        if not normalized:
+            return {}
+        values = await self.redis.mget([f"{CACHE_PREFIX}{n}" for n in normalized])
+        return {n: None if v is None else v == "1" for n, v in zip(normalized, values)}
+
+    async def set(self, phone_number: str, exists: bool):
+        ttl = self.positive_ttl if exists else self.negative_ttl
+        await self.redis.set(phone_cache_key(phone_number), "1" if exists else "0", ex=ttl)
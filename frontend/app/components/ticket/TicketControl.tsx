@@ -82,7 +82,6 @@ const MessageModal: React.FC<{
 interface Ticket {
   id: number;
   numero_ticket: string;
-  qr_ticket: string;
   cedula: string;
   nombre: string;
   telefono: string;
@@ -612,7 +611,7 @@ const TicketControl: React.FC = () => {
                   <p><strong>Creado en:</strong> {new Date(selectedTicket.created_at).toLocaleString()}</p>
                   <div className="mt-4">
                     <p><strong>QR Code:</strong></p>
-                    <img src={`data:image/png;base64,${selectedTicket.qr_ticket}`} alt="QR Code" className="mx-auto mt-2 border"/>
+                    <img src={`${APIHost}/api/tickets/${selectedTicket.id}/qr.png`} alt="QR Code" className="mx-auto mt-2 border"/>
                   </div>
                 </div>
                 <div className="modal-action">
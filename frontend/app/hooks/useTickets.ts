@@ -7,7 +7,6 @@ import { apiClient } from '../api';
 interface Ticket {
   id: number;
   numero_ticket: string;
-  qr_ticket: string;
   cedula: string;
   nombre: string;
   telefono: string;
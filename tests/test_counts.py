@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+from app.utils.counts import COUNT_EXACT, TableCounter
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def register_script(self, script):
+        return None
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = str(value)
+
+
+class FakeQuery:
+    def __init__(self, total):
+        self.total = total
+        self.threads = []
+
+    def count(self):
+        self.threads.append(threading.current_thread())
+        return self.total
+
+
+def test_count_exacto_corre_fuera_del_event_loop_y_se_cachea():
+    counter = TableCounter(FakeRedis(), "electores", ["codigo_estado"])
+    query = FakeQuery(42)
+
+    async def contar():
+        loop_thread = threading.current_thread()
+        primero = await counter.count(None, query, {"codigo_estado": 1}, COUNT_EXACT)
+        segundo = await counter.count(None, query, {"codigo_estado": 1}, COUNT_EXACT)
+        return loop_thread, primero, segundo
+
+    loop_thread, primero, segundo = asyncio.run(contar())
+    assert primero == segundo == 42
+    # Solo la primera vez se consulta la base, y no desde el hilo del event loop
+    assert len(query.threads) == 1 and query.threads[0] is not loop_thread
@@ -0,0 +1,60 @@
+import pytest
+
+from app import database
+from app.database import parse_lsn, pool_settings
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    monkeypatch.delenv("DB_POOL_SIZE", raising=False)
+    monkeypatch.delenv("DB_MAX_OVERFLOW", raising=False)
+
+    def configure(max_connections, reserved, web_concurrency, extra_processes):
+        monkeypatch.setattr(database, "POSTGRES_MAX_CONNECTIONS", max_connections)
+        monkeypatch.setattr(database, "DB_RESERVED_CONNECTIONS", reserved)
+        monkeypatch.setattr(database, "WEB_CONCURRENCY", web_concurrency)
+        monkeypatch.setattr(database, "DB_EXTRA_PROCESSES", extra_processes)
+    return configure
+
+
+def test_pool_settings_reparte_el_presupuesto(budget):
+    budget(max_connections=200, reserved=10, web_concurrency=4, extra_processes=4)
+    settings = pool_settings()
+    # 12 motores (2 por worker + 4 procesos) con 190 conexiones: 15 por motor
+    assert settings == {"pool_size": 8, "max_overflow": 7}
+    assert (4 * 2 + 4) * (settings["pool_size"] + settings["max_overflow"]) <= 190
+
+
+def test_pool_settings_no_advierte_dentro_del_presupuesto(budget, capsys):
+    budget(max_connections=200, reserved=10, web_concurrency=4, extra_processes=4)
+    pool_settings()
+    assert "ADVERTENCIA" not in capsys.readouterr().out
+
+
+def test_pool_settings_advierte_si_el_minimo_excede_el_presupuesto(budget, capsys):
+    # 20 motores con 10 conexiones disponibles: el mínimo de 2 por motor pide 40
+    budget(max_connections=20, reserved=10, web_concurrency=8, extra_processes=4)
+    assert pool_settings() == {"pool_size": 1, "max_overflow": 1}
+    out = capsys.readouterr().out
+    assert "ADVERTENCIA" in out and "= 40" in out and "presupuesto de 10" in out
+
+
+def test_pool_settings_respeta_valores_explicitos(budget, monkeypatch):
+    budget(max_connections=200, reserved=10, web_concurrency=4, extra_processes=4)
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    assert pool_settings() == {"pool_size": 3, "max_overflow": 0}
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "2")
+    assert pool_settings() == {"pool_size": 3, "max_overflow": 2}
+
+
+def test_parse_lsn():
+    assert parse_lsn("0/0") == 0
+    assert parse_lsn("16/B374D848") == (0x16 << 32) | 0xB374D848
+    assert parse_lsn(None) is None
+    assert parse_lsn("") is None
+
+
+def test_parse_lsn_ordena_por_posicion():
+    # La parte baja no se compara como texto: 0/A0000000 va antes que 1/10
+    assert parse_lsn("0/A0000000") < parse_lsn("1/10") < parse_lsn("1/FF")
+    assert parse_lsn("FFFFFFFF/FFFFFFFF") > parse_lsn("16/B374D848")
@@ -0,0 +1,17 @@
+import pytest
+
+from app.utils.elector_lookup import MAX_CEDULA_DIGITS, parse_cedula
+
+
+@pytest.mark.parametrize("value", ["V-12.345.678", "12345678", "12.345.678", " v12345678 ", 12345678])
+def test_parse_cedula_normaliza_formatos(value):
+    assert parse_cedula(value) == 12345678
+
+
+@pytest.mark.parametrize("value", [None, "", "V-", "abc", 0, -5, "1" * (MAX_CEDULA_DIGITS + 1)])
+def test_parse_cedula_rechaza_invalidas(value):
+    assert parse_cedula(value) is None
+
+
+def test_parse_cedula_acepta_maximo_de_digitos():
+    assert parse_cedula("9" * MAX_CEDULA_DIGITS) == int("9" * MAX_CEDULA_DIGITS)
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from app.utils.encoding import CACHE_FILENAME, detect_encoding, file_fingerprint, redetect_encoding, sample_encoding
+
+LINEA = "V;12345678;PEREZ;JOSE;CARACAS\n"
+LINEA_ACENTOS = "V;87654321;MUÑOZ;JOSÉ;MÉRIDA\n"
+
+
+def test_sample_encoding_ascii_se_lee_como_utf8(tmp_path):
+    path = tmp_path / "ascii.txt"
+    path.write_text(LINEA * 100, encoding="ascii")
+    assert sample_encoding(str(path)) == "utf-8"
+
+
+def test_sample_encoding_utf8(tmp_path):
+    path = tmp_path / "utf8.txt"
+    path.write_text(LINEA_ACENTOS * 100, encoding="utf-8")
+    assert sample_encoding(str(path)).lower() == "utf-8"
+
+
+def test_sample_encoding_encuentra_acentos_despues_del_inicio(tmp_path):
+    # El inicio es ASCII puro; los acentos solo aparecen en una ventana posterior
+    path = tmp_path / "latin1.txt"
+    path.write_bytes((LINEA * 2000 + LINEA_ACENTOS * 2000).encode("latin-1"))
+    encoding = sample_encoding(str(path), head_size=4096, windows=4, window_size=4096)
+    assert encoding.lower() in ("iso-8859-1", "windows-1252")
+
+
+def test_sample_encoding_archivo_vacio(tmp_path):
+    path = tmp_path / "vacio.txt"
+    path.write_bytes(b"")
+    assert sample_encoding(str(path)) == "utf-8"
+
+
+def test_acentos_entre_ventanas_se_corrigen_con_redeteccion(tmp_path):
+    # Cabecera de 4 KB y ventanas cada ~40 KB: los acentos quedan entre la
+    # cabecera y la primera ventana, así que el muestreo solo ve ASCII
+    path = tmp_path / "latin1.txt"
+    path.write_bytes((LINEA * 300 + LINEA_ACENTOS * 20 + LINEA * 6000).encode("latin-1"))
+    muestreo = sample_encoding(str(path), head_size=4096, windows=4, window_size=4096)
+    assert muestreo == "utf-8"
+    with pytest.raises(UnicodeDecodeError):
+        path.read_text(encoding=muestreo)
+
+    encoding = redetect_encoding(str(path), muestreo)
+    assert "MUÑOZ" in path.read_text(encoding=encoding)
+    # La detección corregida reemplaza la guardada en el cache
+    assert detect_encoding(str(path)) == encoding
+    cache = json.loads((tmp_path / CACHE_FILENAME).read_text(encoding="utf-8"))
+    assert cache[file_fingerprint(str(path))] == encoding
+
+
+def test_redetect_encoding_no_repite_la_que_fallo(tmp_path):
+    path = tmp_path / "raro.txt"
+    path.write_bytes(LINEA.encode("ascii") * 10 + b"\x81\x8d\n")
+    encoding = redetect_encoding(str(path), "windows-1252")
+    assert encoding != "windows-1252"
+    path.read_text(encoding=encoding)
@@ -0,0 +1,19 @@
+import pytest
+
+from app.utils.exports import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("after", [None, 0, 12345, "V12345678", [3, "b"]])
+def test_cursor_ida_y_vuelta(after):
+    assert decode_cursor(encode_cursor(after)) == after
+
+
+def test_cursor_es_seguro_en_url():
+    token = encode_cursor("a/b+c?=" * 5)
+    assert set(token) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=")
+
+
+@pytest.mark.parametrize("token", ["", "no-es-base64!", encode_cursor(1)[:-4], "eyJvdHJvIjogMX0="])
+def test_decode_cursor_rechaza_tokens_invalidos(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
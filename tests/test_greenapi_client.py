@@ -0,0 +1,35 @@
+import httpx
+import pytest
+
+from app.utils.greenapi_client import GreenAPIClient, normalize_chat_id
+
+
+@pytest.fixture
+def client():
+    return GreenAPIClient("https://api.example/waInstance1", "token", retries=3)
+
+
+@pytest.mark.parametrize("status_code", [429, 502, 503, 504, 500])
+def test_consultas_reintentan_errores_del_servidor(client, status_code):
+    assert client._should_retry(0, None, status_code, idempotent=True)
+
+
+@pytest.mark.parametrize("status_code,retry", [(429, True), (503, True), (502, False), (504, False), (500, False)])
+def test_envios_no_reintentan_si_pudieron_entregarse(client, status_code, retry):
+    assert client._should_retry(0, None, status_code, idempotent=False) is retry
+
+
+def test_envios_sin_respuesta_solo_reintentan_si_no_salieron(client):
+    request = httpx.Request("POST", "https://api.example")
+    assert client._should_retry(0, httpx.ConnectError("x", request=request), None, idempotent=False)
+    assert not client._should_retry(0, httpx.ReadTimeout("x", request=request), None, idempotent=False)
+    assert client._should_retry(0, httpx.ReadTimeout("x", request=request), None, idempotent=True)
+
+
+def test_no_reintenta_al_agotar_intentos(client):
+    assert not client._should_retry(3, None, 429, idempotent=True)
+
+
+def test_normalize_chat_id():
+    assert normalize_chat_id(584121234567) == "584121234567@c.us"
+    assert normalize_chat_id("123@g.us") == "123@g.us"
@@ -0,0 +1,27 @@
+from app.utils.qr_tickets import PAYLOAD_PREFIX, qr_payload, verify_qr_payload
+
+SECRET = "clave-de-prueba"
+
+
+def test_qr_payload_ida_y_vuelta():
+    payload = qr_payload("AbC123xYz789", SECRET)
+    assert payload.startswith(f"{PAYLOAD_PREFIX}.AbC123xYz789.")
+    assert verify_qr_payload(payload, SECRET) == "AbC123xYz789"
+
+
+def test_verify_qr_payload_ignora_espacios():
+    assert verify_qr_payload(f"  {qr_payload('T1', SECRET)}\n", SECRET) == "T1"
+
+
+def test_verify_qr_payload_rechaza_otra_clave():
+    assert verify_qr_payload(qr_payload("T1", SECRET), "otra-clave") is None
+
+
+def test_verify_qr_payload_rechaza_numero_alterado():
+    _, _, signature = qr_payload("T1", SECRET).split(".")
+    assert verify_qr_payload(f"{PAYLOAD_PREFIX}.T2.{signature}", SECRET) is None
+
+
+def test_verify_qr_payload_rechaza_formato_invalido():
+    for payload in ["", "T1", "LB0.T1.abcd", "LB1.T1", "LB1.T1.abcd.extra"]:
+        assert verify_qr_payload(payload, SECRET) is None
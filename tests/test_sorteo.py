@@ -0,0 +1,78 @@
+from array import array
+
+import pytest
+
+from app.models import Sorteo
+from app.utils.sorteo import (
+    NotEnoughTickets,
+    pack_snapshot,
+    seeded_sample,
+    snapshot_hash,
+    unpack_snapshot,
+    verify_draw,
+)
+
+
+def test_seeded_sample_es_reproducible():
+    assert seeded_sample("semilla", 1000, 10) == seeded_sample("semilla", 1000, 10)
+    assert seeded_sample("semilla", 1000, 10) != seeded_sample("otra", 1000, 10)
+
+
+def test_seeded_sample_posiciones_distintas_en_rango():
+    posiciones = seeded_sample("abc", 50, 50)
+    assert sorted(posiciones) == list(range(50))
+
+
+def test_seeded_sample_valor_conocido():
+    # Fija el algoritmo: cambiarlo invalidaría la verificación de sorteos guardados
+    assert seeded_sample("semilla", 1000, 5) == [340, 270, 824, 367, 976]
+    # Pedir menos ganadores da un prefijo de la misma secuencia
+    assert seeded_sample("semilla", 1000, 2) == [340, 270]
+
+
+def test_seeded_sample_casos_limite():
+    assert seeded_sample("s", 5, 0) == []
+    with pytest.raises(NotEnoughTickets):
+        seeded_sample("s", 3, 4)
+
+
+def test_pack_unpack_snapshot():
+    ids = array('I', [1, 2, 7, 100, 100000, 4294967295])
+    assert unpack_snapshot(pack_snapshot(ids)) == ids
+    assert unpack_snapshot(pack_snapshot(array('I'))) == array('I')
+
+
+def test_snapshot_hash_usa_little_endian():
+    assert snapshot_hash(array('I', [1])) == snapshot_hash(array('I', [1]))
+    assert snapshot_hash(array('I', [1, 2])) != snapshot_hash(array('I', [2, 1]))
+
+
+def _sorteo(ids, semilla="semilla", cantidad=3):
+    ids = array('I', ids)
+    ganadores = [ids[p] for p in seeded_sample(semilla, len(ids), cantidad)]
+    return Sorteo(
+        id=1,
+        semilla=semilla,
+        cantidad=cantidad,
+        total_elegibles=len(ids),
+        snapshot=pack_snapshot(ids),
+        snapshot_hash=snapshot_hash(ids),
+        ganadores=ganadores,
+    )
+
+
+def test_verify_draw_acepta_sorteo_integro():
+    resultado = verify_draw(_sorteo(range(10, 200, 3)))
+    assert resultado["snapshot_valido"] and resultado["ganadores_validos"]
+
+
+def test_verify_draw_detecta_ganadores_alterados():
+    sorteo = _sorteo(range(10, 200, 3))
+    sorteo.ganadores = [sorteo.ganadores[1], sorteo.ganadores[0], sorteo.ganadores[2]]
+    assert not verify_draw(sorteo)["ganadores_validos"]
+
+
+def test_verify_draw_detecta_snapshot_alterado():
+    sorteo = _sorteo(range(10, 200, 3))
+    sorteo.snapshot = pack_snapshot(array('I', range(11, 200, 3)))
+    assert not verify_draw(sorteo)["snapshot_valido"]